@@ -1,10 +1,12 @@
 import streamlit as st
 
+from core.tracing import tracer
 from ui.chat_interface import ChatInterface
 from ui.components import (
     add_message,
     display_chat_history,
     display_sidebar,
+    display_timing,
     init_session_state,
 )
 
@@ -45,18 +47,27 @@ def main():
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        answer, sources = chat.answer(
-            prompt, st.session_state.web_enabled, st.session_state.include_wikipedia
-        )
-
-        add_message("assistant", answer, sources)
-
         with st.chat_message("assistant"):
-            st.markdown(answer)
+            with tracer.trace(
+                "answer",
+                web=st.session_state.web_enabled,
+                wikipedia=st.session_state.include_wikipedia,
+            ) as span:
+                events = chat.answer_stream(
+                    prompt,
+                    st.session_state.web_enabled,
+                    st.session_state.include_wikipedia,
+                )
+                sources = next(events)["sources"]
+                answer = st.write_stream(event["content"] for event in events)
             if sources:
                 with st.expander("📚 Sources"):
                     for src in sources:
                         st.markdown(f"- {src}")
+            timing = span.trace.breakdown() if span.trace else None
+            display_timing(timing)
+
+        add_message("assistant", answer, sources, timing)
 
     st.divider()
     with st.container():
@@ -81,9 +92,30 @@ def main():
         )
 
         if uploaded_files and st.button("Process Documents", type="primary"):
-            with st.spinner("Indexing documents..."):
-                count = chat.process_documents(uploaded_files)
-                st.success(f"Indexed {count} chunks")
+            progress = st.progress(0.0, text="Indexing documents...")
+
+            def on_progress(report):
+                progress.progress(
+                    report.files_done / max(report.total_files, 1),
+                    text=(
+                        f"{report.files_done}/{report.total_files} files • "
+                        f"{report.pages_per_sec:.1f} pages/s • "
+                        f"{report.chunks_per_sec:.1f} chunks/s • "
+                        f"{report.embeddings_per_sec:.1f} embeddings/s"
+                    ),
+                )
+
+            report = chat.process_documents(uploaded_files, on_progress)
+            st.success(
+                f"Indexed {report.embedded} chunks "
+                f"({report.duplicate_chunks} duplicate chunks, "
+                f"{len(report.skipped)} unchanged files skipped)"
+            )
+
+            for name, error in report.failures.items():
+                st.warning(f"Failed to index {name}: {error}")
+
+            if not report.failures:
                 st.rerun()
 
 
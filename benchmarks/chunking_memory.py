@@ -0,0 +1,120 @@
+"""
+Peak resident memory of ingesting one large text file end to end with
+hashing embeddings: the whole file as one document chunked into a list
+of dicts and stored batch by batch (as before), versus IngestionPipeline
+streaming it. Both peaks include the index and docstore being built.
+Each mode runs in a fresh interpreter.
+
+    python -m benchmarks.chunking_memory --megabytes 200
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from .corpus import FILLER
+
+MODES = ("list", "stream")
+
+
+def write_text(path: str, megabytes: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    target = megabytes << 20
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            paragraph = " ".join(rng.choice(FILLER) for _ in range(120)) + ".\n\n"
+            f.write(paragraph)
+            written += len(paragraph)
+
+
+def _run(mode: str, path: str, workdir: str) -> dict:
+    from config import settings
+    from core.document import document_id, file_content_hash
+    from core.document.chunker import DocumentChunker
+    from core.ingest import IngestionPipeline
+    from core.vectorstore import VectorStoreService
+
+    from .fakes import HashingEmbeddingProvider
+
+    # A store per mode, or the second would skip the file as indexed
+    os.makedirs(os.path.join(workdir, mode))
+    os.chdir(os.path.join(workdir, mode))
+    started = time.perf_counter()
+    store = VectorStoreService(HashingEmbeddingProvider())
+
+    if mode == "list":
+        content_hash = file_content_hash(path)
+        metadata = {
+            "source": path,
+            "title": "large.txt",
+            "content_hash": content_hash,
+            "doc_id": document_id(path, content_hash),
+        }
+        with open(path, encoding="utf-8") as f:
+            document = {"content": f.read(), "metadata": metadata}
+        chunks = DocumentChunker().chunk([document])
+        for i in range(0, len(chunks), settings.INGEST_BATCH_SIZE):
+            store.add_documents(
+                chunks[i : i + settings.INGEST_BATCH_SIZE], persist=False
+            )
+        store.persist()
+        count = len(chunks)
+    else:
+        count = IngestionPipeline(store).ingest([(path, "large.txt")]).chunks
+
+    return {
+        "chunks": count,
+        "seconds": time.perf_counter() - started,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--megabytes", type=int, default=100)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--run", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(_run(args.run, args.path, args.workdir)))
+        return
+
+    results = {"file_mb": args.megabytes}
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "large.txt")
+        write_text(path, args.megabytes)
+
+        for mode in args.modes:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.chunking_memory",
+                    "--run",
+                    mode,
+                    "--path",
+                    path,
+                    "--workdir",
+                    workdir,
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Recursive versus semantic chunking on the same synthetic corpus, whose
+documents move through several topics: chunk count and size, index size
+on disk, ingest time, recall@k and MRR, and the characters of context the
+top results put into a prompt. Each mode runs in a fresh interpreter with
+CHUNKING_MODE set.
+
+    python -m benchmarks.chunking_modes --documents 200 --sections 4
+    python -m benchmarks.chunking_modes --embeddings model
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+MODES = ("recursive", "semantic")
+
+
+def _disk_bytes(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory)
+        for name in names
+    )
+
+
+def _run(args) -> dict:
+    from config import settings
+    from core.registry import registry, shared_embedding_provider
+    from core.retriever import RetrieverService
+    from core.vectorstore import VectorStoreService
+
+    from .corpus import make_corpus
+    from .fakes import HashingEmbeddingProvider
+    from .suite import _ingest, _recall
+
+    os.chdir(args.workdir)
+    if args.embeddings == "hashing":
+        # Seen by the semantic splitter as well as the store
+        registry.get("embedding_provider", HashingEmbeddingProvider)
+    store = VectorStoreService(shared_embedding_provider())
+
+    corpus = make_corpus(
+        os.path.join(args.workdir, "corpus"),
+        args.documents,
+        args.words,
+        args.queries,
+        args.seed,
+        sections=args.sections,
+    )
+    ingest = _ingest(store, corpus.files)
+
+    faiss_store = store.store
+    chunk_chars = [
+        len(faiss_store.docstore.search(chunk_id).page_content)
+        for chunk_id in faiss_store.index_to_docstore_id.values()
+    ]
+    retriever = RetrieverService(store)
+    recall = _recall(retriever, corpus.queries, [1, settings.TOP_K])
+    context_chars = [
+        sum(len(doc.page_content) for doc in retriever.retrieve(query))
+        for query, _ in corpus.queries
+    ]
+
+    return {
+        "mode": settings.CHUNKING_MODE,
+        "chunks": len(chunk_chars),
+        "chunk_chars_mean": float(np.mean(chunk_chars)),
+        "chunk_chars_p95": float(np.percentile(chunk_chars, 95)),
+        "index_bytes": _disk_bytes(os.path.join(args.workdir, "data")),
+        "ingest_s": ingest["elapsed_s"],
+        "recall": recall,
+        "context_chars_mean": float(np.mean(context_chars)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--sections", type=int, default=4, help="topics per document")
+    parser.add_argument("--words", type=int, default=1600, help="per document")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--embeddings", choices=["hashing", "model"], default="hashing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(_run(args)))
+        return
+
+    results = {}
+    for mode in MODES:
+        with tempfile.TemporaryDirectory() as workdir:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.chunking_modes", "--run"]
+                + sys.argv[1:]
+                + ["--workdir", workdir],
+                env={**os.environ, "CHUNKING_MODE": mode},
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Cold start of a persisted store: the pickled FAISS.save_local layout
+versus the memory-mapped index and offset-indexed docstore.
+
+    python -m benchmarks.cold_start --chunks 10000 100000
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from core.vectorstore.docstore import OffsetDocstore, PositionIds
+from core.vectorstore.index import read_index, write_index
+
+DIM = 384
+
+
+def _build(directory: str, count: int) -> None:
+    rng = np.random.default_rng(0)
+    index = faiss.IndexFlatL2(DIM)
+    index.add(rng.standard_normal((count, DIM)).astype(np.float32))
+
+    ids = [f"{i:064x}" for i in range(count)]
+    docs = {
+        chunk_id: Document(
+            id=chunk_id,
+            page_content=f"chunk {i} " * 80,
+            metadata={"doc_id": f"doc{i // 50}", "title": f"file{i // 50}.pdf"},
+        )
+        for i, chunk_id in enumerate(ids)
+    }
+    mapping = dict(enumerate(ids))
+
+    legacy = FAISS(
+        DeterministicFakeEmbedding(size=DIM),
+        index,
+        InMemoryDocstore(dict(docs)),
+        mapping,
+    )
+    legacy.save_local(os.path.join(directory, "legacy"))
+
+    mapped_dir = os.path.join(directory, "mapped")
+    os.makedirs(mapped_dir)
+    docstore = OffsetDocstore(mapped_dir)
+    docstore.add(docs)
+    docstore.save()
+    PositionIds.save(mapped_dir, mapping)
+    write_index(index, os.path.join(mapped_dir, "index.faiss"))
+
+
+def _first_query_ms(store: FAISS, started: float) -> float:
+    query = np.random.default_rng(1).standard_normal((1, DIM)).astype(np.float32)
+    _, positions = store.index.search(query, 4)
+    for position in positions[0]:
+        store.docstore.search(store.index_to_docstore_id[position])
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    embedding = DeterministicFakeEmbedding(size=DIM)
+    results = []
+
+    for count in args.chunks:
+        with tempfile.TemporaryDirectory() as directory:
+            _build(directory, count)
+
+            started = time.perf_counter()
+            legacy = FAISS.load_local(
+                os.path.join(directory, "legacy"),
+                embedding,
+                allow_dangerous_deserialization=True,
+            )
+            legacy_open = (time.perf_counter() - started) * 1000
+            legacy_query = _first_query_ms(legacy, started)
+
+            # Keep the pickled objects from skewing the next timing via GC
+            del legacy
+            gc.collect()
+
+            mapped_dir = os.path.join(directory, "mapped")
+            started = time.perf_counter()
+            mapped = FAISS(
+                embedding,
+                read_index(os.path.join(mapped_dir, "index.faiss"), mmap=True),
+                OffsetDocstore(mapped_dir),
+                PositionIds.load(mapped_dir),
+            )
+            mapped_open = (time.perf_counter() - started) * 1000
+            mapped_query = _first_query_ms(mapped, started)
+            del mapped
+
+            results.append(
+                {
+                    "chunks": count,
+                    "pickle_open_ms": legacy_open,
+                    "pickle_first_query_ms": legacy_query,
+                    "mmap_open_ms": mapped_open,
+                    "mmap_first_query_ms": mapped_query,
+                }
+            )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
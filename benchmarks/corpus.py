@@ -0,0 +1,113 @@
+"""
+Synthetic corpora with known answers. Every document mixes shared filler
+vocabulary with a handful of terms that occur nowhere else, and each
+query asks about some of those terms, so its relevant document is known.
+"""
+
+import os
+import random
+from dataclasses import dataclass
+from typing import List, Tuple
+
+FILLER = (
+    "system data service request user model network storage policy process "
+    "report value error cache index query result support team release version "
+    "update config metric latency throughput cluster node region backup access "
+    "the a of to and in for with on by from that this is are was be"
+).split()
+
+SYLLABLES = (
+    "ka lo mi ru te zan vor pel quin dra sol fen gri tho bex nur yal cor".split()
+)
+
+
+@dataclass
+class SyntheticCorpus:
+    # (path, title) pairs, in the form IngestionPipeline.ingest takes
+    files: List[Tuple[str, str]]
+    # (query, title of the one relevant document)
+    queries: List[Tuple[str, str]]
+
+
+def _term(rng: random.Random, used: set) -> str:
+    while True:
+        term = "".join(rng.choice(SYLLABLES) for _ in range(3)) + str(
+            rng.randint(10, 99)
+        )
+        if term not in used:
+            used.add(term)
+            return term
+
+
+def _section_words(rng: random.Random, terms: List[str], topic: List[str], count: int):
+    # A section's own terms are rare; its topic vocabulary, if any, is common
+    words = []
+    for _ in range(count):
+        draw = rng.random()
+        if draw < 0.04:
+            words.append(rng.choice(terms))
+        elif topic and draw < 0.4:
+            words.append(rng.choice(topic))
+        else:
+            words.append(rng.choice(FILLER))
+    return words
+
+
+def make_corpus(
+    directory: str,
+    documents: int,
+    words_per_document: int = 1200,
+    queries: int = 200,
+    seed: int = 0,
+    start: int = 0,
+    sections: int = 1,
+) -> SyntheticCorpus:
+    """
+    Write `documents` text files into `directory`; numbering begins at
+    `start`. With several `sections`, each document moves through that many
+    topics, each with its own vocabulary, and a query targets one of them.
+    """
+    rng = random.Random(seed * 1_000_003 + start)
+    used: set = set()
+    os.makedirs(directory, exist_ok=True)
+
+    files = []
+    doc_terms = {}
+    for number in range(start, start + documents):
+        title = f"doc_{number:06d}.txt"
+        doc_terms[title] = []
+        paragraphs = []
+
+        for _ in range(sections):
+            terms = [_term(rng, used) for _ in range(6)]
+            topic = [_term(rng, used) for _ in range(20)] if sections > 1 else []
+            doc_terms[title].append(terms)
+
+            words = _section_words(rng, terms, topic, words_per_document // sections)
+            sentences = [
+                " ".join(words[i : i + 15]).capitalize() + "."
+                for i in range(0, len(words), 15)
+            ]
+            paragraphs.extend(
+                " ".join(sentences[i : i + 6]) for i in range(0, len(sentences), 6)
+            )
+
+        path = os.path.join(directory, title)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(paragraphs))
+        files.append((path, title))
+
+    titles = list(doc_terms)
+    query_list = []
+    for _ in range(queries):
+        title = rng.choice(titles)
+        asked = rng.sample(rng.choice(doc_terms[title]), 2)
+        query_list.append(
+            (
+                f"What does the {rng.choice(FILLER[:20])} say about {asked[0]} "
+                f"and {asked[1]}?",
+                title,
+            )
+        )
+
+    return SyntheticCorpus(files, query_list)
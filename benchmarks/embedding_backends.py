@@ -0,0 +1,88 @@
+"""
+PyTorch versus int8 ONNX Runtime embeddings of EMBEDDING_MODEL: cosine
+parity per sentence, top-k neighbour agreement, and sentences per second.
+Exits non-zero when the mean cosine falls below --min-cosine.
+
+    python -m benchmarks.embedding_backends --sentences 2000
+"""
+
+import argparse
+import glob
+import json
+import re
+import sys
+import time
+
+import numpy as np
+
+from core.embedding.huggingface import HuggingFaceEmbeddingProvider
+from core.embedding.onnx_runtime import OnnxEmbeddingProvider
+
+
+def _sentences(count: int):
+    # Real prose from the repository's own markdown, repeated to size
+    text = " ".join(open(p, encoding="utf-8").read() for p in glob.glob("*.md"))
+    pieces = [
+        s.strip() for s in re.split(r"(?<=[.!?])\s+|\n+", text) if len(s.split()) >= 4
+    ]
+    return [f"{pieces[i % len(pieces)]} ({i})" for i in range(count)]
+
+
+def _normalized(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _throughput(provider, sentences, batch_size: int):
+    provider.embed_documents(sentences[:batch_size])  # warm up
+    vectors = []
+    started = time.perf_counter()
+    for i in range(0, len(sentences), batch_size):
+        vectors.extend(provider.embed_documents(sentences[i : i + batch_size]))
+    return _normalized(vectors), len(sentences) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    args = parser.parse_args()
+
+    sentences = _sentences(args.sentences)
+    torch_vectors, torch_rate = _throughput(
+        HuggingFaceEmbeddingProvider(), sentences, args.batch_size
+    )
+    onnx_vectors, onnx_rate = _throughput(
+        OnnxEmbeddingProvider(), sentences, args.batch_size
+    )
+
+    cosine = np.sum(torch_vectors * onnx_vectors, axis=1)
+
+    # Do the two backends retrieve the same neighbours for the same query?
+    queries = torch_vectors[:: max(1, len(sentences) // 100)]
+    onnx_queries = onnx_vectors[:: max(1, len(sentences) // 100)]
+    torch_top = np.argsort(-(queries @ torch_vectors.T), axis=1)[:, : args.k]
+    onnx_top = np.argsort(-(onnx_queries @ onnx_vectors.T), axis=1)[:, : args.k]
+    overlap = np.mean(
+        [len(set(a) & set(b)) / args.k for a, b in zip(torch_top, onnx_top)]
+    )
+
+    results = {
+        "sentences": len(sentences),
+        "torch_sentences_per_s": torch_rate,
+        "onnx_int8_sentences_per_s": onnx_rate,
+        "speedup": onnx_rate / torch_rate,
+        "cosine_mean": float(cosine.mean()),
+        "cosine_min": float(cosine.min()),
+        f"top{args.k}_overlap": float(overlap),
+    }
+    print(json.dumps(results, indent=2))
+
+    if results["cosine_mean"] < args.min_cosine:
+        sys.exit(f"cosine parity {results['cosine_mean']:.4f} < {args.min_cosine}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Prompt size and latency of external (Wikipedia/web) context: whole
+articles pasted into the prompt versus chunked, reranked passages under
+EXTERNAL_CONTEXT_TOKENS.
+
+    python -m benchmarks.external_context --runs 50
+    python -m benchmarks.external_context --live   # also time Groq calls
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.messages import HumanMessage
+
+from config import settings
+from core.document.chunker import DocumentChunker
+from core.llm import count_tokens, get_llm_provider
+from core.retriever import PassageReranker
+
+QUERY = "Who proposed the imitation game and why?"
+
+
+def _articles(count: int, chars: int, source_type: str):
+    rng = random.Random(count * chars)
+    words = "the of machine test computing theory war code paper game".split()
+    return [
+        {
+            "content": " ".join(rng.choice(words) for _ in range(chars // 6))[:chars],
+            "metadata": {"source_type": source_type, "title": f"{source_type} {i}"},
+        }
+        for i in range(count)
+    ]
+
+
+def _prompt(docs) -> str:
+    context = "\n\n".join(f"[{i}] {doc.page_content}" for i, doc in enumerate(docs, 1))
+    return f"Context:\n{context}\n\nQuestion:\n{QUERY}"
+
+
+def _median_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    raw = _articles(5, settings.WIKIPEDIA_MAX_CHARS, "wikipedia") + _articles(
+        5, 1500, "web"
+    )
+    whole = [Document(page_content=a["content"], metadata=a["metadata"]) for a in raw]
+    passages = [
+        Document(page_content=c["content"], metadata=c["metadata"])
+        for c in DocumentChunker().chunk(raw)
+    ]
+    reranker = PassageReranker(
+        DeterministicFakeEmbedding(size=384),
+        settings.EXTERNAL_CONTEXT_TOKENS,
+        settings.EXTERNAL_TOP_K,
+    )
+    selected = reranker.rerank(QUERY, passages)
+
+    before, after = _prompt(whole), _prompt(selected)
+    results = {
+        "before": {"passages": len(whole), "prompt_tokens": count_tokens(before)},
+        "after": {
+            "passages": len(selected),
+            "candidates": len(passages),
+            "prompt_tokens": count_tokens(after),
+            "rerank_ms": _median_ms(
+                lambda: reranker.rerank(QUERY, passages), args.runs
+            ),
+        },
+    }
+
+    if args.live:
+        llm = get_llm_provider()
+        for label, prompt in (("before", before), ("after", after)):
+            results[label]["llm_ms"] = _median_ms(
+                lambda: llm.invoke([HumanMessage(content=prompt)]), 3
+            )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
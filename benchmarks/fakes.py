@@ -0,0 +1,173 @@
+"""
+Deterministic offline stand-ins for the Groq LLM, Tavily and Wikipedia,
+with simulated latency, plus a hashing embedding model that needs no
+download. Outputs depend only on inputs and the seed, so runs repeat.
+"""
+
+import hashlib
+import random
+import time
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+from langchain_core.messages import BaseMessage
+
+from core.document import WikipediaDocumentLoader
+from core.embedding import EmbeddingProvider
+from core.llm import LLMProvider
+from core.retriever.lexical import tokenize
+from tools.tavily_search import TavilySearchService
+
+
+class SimulatedLatency:
+    """`base_ms` plus up to `jitter_ms`, drawn from a generator keyed by input."""
+
+    def __init__(self, base_ms: float, jitter_ms: float = 0.0, seed: int = 0):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.seed = seed
+
+    def rng(self, key: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}\0{key}".encode("utf-8")).digest()
+        return random.Random(digest)
+
+    def sleep(self, key: str) -> None:
+        delay = self.base_ms + self.jitter_ms * self.rng(key).random()
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Bag of hashed tokens, L2-normalized: lexical overlap becomes cosine."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(digest, "little") % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text)
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    Waits `latency` before answering, then streams at `tokens_per_s`.
+    Router prompts get `route_label`; everything else gets a short answer
+    quoting the start of the context.
+    """
+
+    def __init__(
+        self,
+        latency: SimulatedLatency,
+        tokens_per_s: float = 0.0,
+        route_label: str = "DOCUMENT",
+    ):
+        self.latency = latency
+        self.tokens_per_s = tokens_per_s
+        self.route_label = route_label
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        if "intent classifier" in messages[0].content:
+            return self.route_label
+        prompt = messages[-1].content
+        words = prompt.split()
+        return "According to the context, " + " ".join(words[1:40]) + "."
+
+    def invoke(self, messages: List[BaseMessage]) -> str:
+        self.latency.sleep(messages[-1].content)
+        answer = self._answer(messages)
+        if self.tokens_per_s:
+            time.sleep(len(answer.split()) / self.tokens_per_s)
+        return answer
+
+    def stream(self, messages: List[BaseMessage]) -> Iterator[str]:
+        self.latency.sleep(messages[-1].content)
+        for word in self._answer(messages).split():
+            if self.tokens_per_s:
+                time.sleep(1 / self.tokens_per_s)
+            yield word + " "
+
+
+def _paragraphs(rng: random.Random, query: str, count: int, words: int) -> List[str]:
+    terms = tokenize(query) or ["result"]
+    filler = "the of and a report notes that which system data study".split()
+    return [
+        " ".join(
+            rng.choice(terms if rng.random() < 0.3 else filler) for _ in range(words)
+        )
+        for _ in range(count)
+    ]
+
+
+class FakeTavilySearch(TavilySearchService):
+    """Only the HTTP call is replaced; caching and chunking are the real ones."""
+
+    def __init__(self, latency: SimulatedLatency, words_per_result: int = 300):
+        super().__init__()
+        self.latency = latency
+        self.words_per_result = words_per_result
+
+    def _fetch(self, query: str) -> Dict[str, Any]:
+        self.latency.sleep(query)
+        rng = self.latency.rng(query)
+        texts = _paragraphs(rng, query, self.max_results, self.words_per_result)
+        slug = hashlib.sha256(query.encode("utf-8")).hexdigest()[:12]
+        return {
+            "results": [
+                {
+                    "title": f"Result {i} for {query[:40]}",
+                    "url": f"https://example.com/{slug}/{i}",
+                    "content": text,
+                }
+                for i, text in enumerate(texts)
+            ]
+        }
+
+
+class FakeWikipediaLoader(WikipediaDocumentLoader):
+    """Answers the two MediaWiki requests (search, then extracts) locally."""
+
+    def __init__(self, latency: SimulatedLatency, words_per_article: int = 1500):
+        super().__init__()
+        self.latency = latency
+        self.words_per_article = words_per_article
+
+    def _request(self, **params) -> Dict[str, Any]:
+        key = repr(sorted(params.items()))
+        self.latency.sleep(key)
+
+        if params.get("list") == "search":
+            query = params["srsearch"]
+            return {
+                "query": {
+                    "search": [
+                        {"title": f"{query[:40]} ({i})"}
+                        for i in range(params["srlimit"])
+                    ]
+                }
+            }
+
+        title = params["titles"]
+        text = _paragraphs(self.latency.rng(key), title, 1, self.words_per_article)
+        page_id = int(hashlib.sha256(title.encode("utf-8")).hexdigest()[:8], 16)
+        return {
+            "query": {
+                "pages": {
+                    str(page_id): {
+                        "pageid": page_id,
+                        "title": title,
+                        "fullurl": f"https://en.wikipedia.org/?curid={page_id}",
+                        "extract": text[0],
+                    }
+                }
+            }
+        }
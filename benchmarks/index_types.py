@@ -0,0 +1,99 @@
+"""
+Recall@k and latency of each INDEX_TYPE against the exact flat baseline,
+on clustered synthetic vectors shaped like MiniLM embeddings.
+
+    python -m benchmarks.index_types --vectors 200000 --queries 500
+"""
+
+import argparse
+import json
+import time
+
+import faiss
+import numpy as np
+
+from core.vectorstore.index import INDEX_TYPES, apply_search_params, build_index
+
+NPROBE_SWEEP = (1, 4, 16, 64)
+EF_SEARCH_SWEEP = (16, 64, 256)
+
+
+def _dataset(count: int, queries: int, dim: int, clusters: int = 256):
+    rng = np.random.default_rng(7)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+
+    def sample(n):
+        points = centers[rng.integers(clusters, size=n)]
+        points += 0.35 * rng.standard_normal((n, dim)).astype(np.float32)
+        return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+    return sample(count), sample(queries)
+
+
+def _search(index, queries: np.ndarray, k: int):
+    started = time.perf_counter()
+    _, ids = index.search(queries, k)
+    per_query_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    return ids, per_query_ms
+
+
+def _recall(ids: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(row) & set(exact)) for row, exact in zip(ids, truth))
+    return hits / truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors, queries = _dataset(args.vectors, args.queries, args.dim)
+    results = {"vectors": args.vectors, "dim": args.dim, "k": args.k, "indexes": []}
+    truth = None
+
+    for index_type in INDEX_TYPES:
+        started = time.perf_counter()
+        index, params = build_index(index_type, vectors)
+        index.add(vectors)
+        build_s = time.perf_counter() - started
+
+        if params["index_type"] != index_type:
+            results["indexes"].append(
+                {"index_type": index_type, "skipped": "too few vectors to train"}
+            )
+            continue
+
+        if "nprobe" in params:
+            sweep = [("nprobe", value) for value in NPROBE_SWEEP]
+        elif "ef_search" in params:
+            sweep = [("ef_search", value) for value in EF_SEARCH_SWEEP]
+        else:
+            sweep = [(None, None)]
+
+        for name, value in sweep:
+            if name is not None:
+                apply_search_params(index, {**params, name: value})
+
+            ids, per_query_ms = _search(index, queries, args.k)
+            if truth is None:
+                truth = ids
+
+            results["indexes"].append(
+                {
+                    **params,
+                    **({name: value} if name else {}),
+                    "memory_mb": faiss.serialize_index(index).nbytes / 2**20,
+                    "build_s": build_s,
+                    "query_ms": per_query_ms,
+                    "recall_at_k": _recall(ids, truth),
+                }
+            )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Pages per second of each PDF backend against the previous PyPDFLoader,
+serially and with pages split across processes. Without --pdf, a
+synthetic text PDF of --pages pages is written and used.
+
+    python -m benchmarks.pdf_extraction --pages 400 --workers 4
+    python -m benchmarks.pdf_extraction --pdf manual.pdf
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from core.document.pdf import PDF_BACKENDS, get_pdf_backend, iter_pdf_pages
+
+WORDS = (
+    "the system stores each request in a local index before the service "
+    "returns a result to the user and writes a report of latency and errors"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: int, lines_per_page: int = 50, seed: int = 0) -> None:
+    """A minimal PDF 1.4 file with Helvetica text on every page."""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # the page tree, once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for _ in range(pages):
+        lines = [
+            "(" + _escape(" ".join(rng.choice(WORDS) for _ in range(12))) + ") Tj T*"
+            for _ in range(lines_per_page)
+        ]
+        stream = ("BT /F1 10 Tf 14 TL 40 800 Td " + " ".join(lines) + " ET").encode()
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        " ".join(f"{n} 0 R" for n in kids).encode(),
+        pages,
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _pypdfloader(path: str) -> List[str]:
+    from langchain_community.document_loaders import PyPDFLoader
+
+    return [doc.page_content for doc in PyPDFLoader(path).load()]
+
+
+def _measure(extract: Callable[[], List[str]], repeats: int) -> Dict:
+    best, texts = float("inf"), []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        texts = extract()
+        best = min(best, time.perf_counter() - started)
+    return {
+        "pages": len(texts),
+        "chars": sum(len(t) for t in texts),
+        "seconds": best,
+        "pages_per_s": len(texts) / best if best else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", help="an existing file instead of a synthetic one")
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--pages-per-task", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = args.pdf
+        if path is None:
+            path = os.path.join(workdir, "synthetic.pdf")
+            write_pdf(path, args.pages)
+
+        results = {"pypdfloader": _measure(lambda: _pypdfloader(path), args.repeats)}
+        for name in PDF_BACKENDS:
+            try:
+                backend = get_pdf_backend(name)
+                backend.page_count(path)
+            except ImportError as exc:
+                results[name] = {"skipped": str(exc)}
+                continue
+
+            for workers in sorted({1, args.workers}):
+                results[f"{name}/{workers}w"] = _measure(
+                    lambda: list(
+                        iter_pdf_pages(backend, path, workers, args.pages_per_task, 0)
+                    ),
+                    args.repeats,
+                )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Query-embedding throughput and latency with concurrent callers: one
+forward pass per query versus BatchingEmbeddingProvider.
+
+    python -m benchmarks.query_batching --users 1 8 32 --queries 512
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+
+from config import settings
+from core.embedding import BatchingEmbeddingProvider
+from core.embedding.huggingface import HuggingFaceEmbeddingProvider
+
+
+def _drive(provider, users: int, queries: int):
+    texts = [f"how does component {i} handle retries?" for i in range(queries)]
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(users)
+
+    def user(offset: int):
+        barrier.wait()
+        for text in texts[offset::users]:
+            started = time.perf_counter()
+            provider.embed_query(text)
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "queries_per_s": queries / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument(
+        "--max-batch-size", type=int, default=settings.QUERY_BATCH_MAX_SIZE
+    )
+    parser.add_argument(
+        "--max-wait-ms", type=float, default=settings.QUERY_BATCH_MAX_WAIT_MS
+    )
+    args = parser.parse_args()
+
+    model = HuggingFaceEmbeddingProvider()
+    model.embed_query("warm up")
+
+    results = []
+    for users in args.users:
+        batching = BatchingEmbeddingProvider(
+            model, args.max_batch_size, args.max_wait_ms
+        )
+        results.append(
+            {
+                "users": users,
+                "unbatched": _drive(model, users, args.queries),
+                "batched": _drive(batching, users, args.queries),
+                **batching.stats,
+            }
+        )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Per-query setup overhead: building the retriever wrapper and opening a
+fresh HTTP connection on every query versus reusing cached components.
+
+    python -m benchmarks.setup_overhead --queries 200
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from core.retriever import RetrieverService
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"results": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StaticStore:
+    version = 0
+
+    def __init__(self, store):
+        self.store = store
+
+    def get_store(self):
+        return self.store
+
+
+def _per_query_ms(fn, queries: int) -> float:
+    started = time.perf_counter()
+    for _ in range(queries):
+        fn()
+    return (time.perf_counter() - started) * 1000 / queries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    store = FAISS.from_texts(
+        [f"chunk {i}" for i in range(1000)], DeterministicFakeEmbedding(size=384)
+    )
+    retriever_service = RetrieverService(_StaticStore(store))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/search"
+    session = requests.Session()
+
+    results = {
+        "queries": args.queries,
+        "retriever_rebuild_ms": _per_query_ms(
+            lambda: store.as_retriever(search_kwargs={"k": 4}), args.queries
+        ),
+        "retriever_cached_ms": _per_query_ms(
+            retriever_service.build_retriever, args.queries
+        ),
+        "http_new_connection_ms": _per_query_ms(
+            lambda: requests.post(url, json={"query": "q"}), args.queries
+        ),
+        "http_keep_alive_ms": _per_query_ms(
+            lambda: session.post(url, json={"query": "q"}), args.queries
+        ),
+    }
+
+    server.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
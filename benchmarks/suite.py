@@ -0,0 +1,272 @@
+"""
+End-to-end benchmark suite that runs offline: ingest throughput,
+incremental adds, recall@k against a synthetic corpus with known answers,
+and query latency percentiles under concurrency. Groq, Tavily and
+Wikipedia are replaced by the simulated services in benchmarks.fakes;
+everything else is the production code path. Results are one JSON
+document, so runs can be diffed or tracked over time.
+
+    python -m benchmarks.suite --documents 500 --concurrency 1 8 32 -o out.json
+    python -m benchmarks.suite --embeddings model   # the configured model
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from config import settings
+from core.chain import RAGChain
+from core.embedding import get_embedding_provider
+from core.ingest import IngestionPipeline
+from core.retriever import RetrieverService
+from core.tracing import MemorySink, tracer
+from core.vectorstore import VectorStoreService
+
+from .corpus import make_corpus
+from .fakes import (
+    FakeLLMProvider,
+    FakeTavilySearch,
+    FakeWikipediaLoader,
+    HashingEmbeddingProvider,
+    SimulatedLatency,
+)
+
+
+def _percentiles(values: Sequence[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "mean": float(np.mean(values)),
+    }
+
+
+def _ingest(store: VectorStoreService, files: List[Tuple[str, str]]) -> Dict:
+    report = IngestionPipeline(store).ingest(files)
+    return {
+        "files": report.files_done,
+        "pages": report.pages,
+        "chunks": report.chunks,
+        "embedded": report.embedded,
+        "failures": len(report.failures),
+        "elapsed_s": report.elapsed,
+        "chunks_per_s": report.chunks_per_sec,
+        "pages_per_s": report.pages_per_sec,
+        "embeddings_per_s": report.embeddings_per_sec,
+    }
+
+
+def _incremental(store: VectorStoreService, files: List[Tuple[str, str]]) -> Dict:
+    # One file at a time into an existing store, as uploads arrive in the UI
+    pipeline = IngestionPipeline(store)
+    latencies, chunks = [], 0
+    started = time.perf_counter()
+    for item in files:
+        file_started = time.perf_counter()
+        chunks += pipeline.ingest([item]).chunks
+        latencies.append((time.perf_counter() - file_started) * 1000)
+    elapsed = time.perf_counter() - started
+    return {
+        "files": len(files),
+        "chunks": chunks,
+        "chunks_per_s": chunks / elapsed if elapsed else 0.0,
+        "file_ms": _percentiles(latencies),
+    }
+
+
+def _recall(
+    retriever: RetrieverService, queries: List[Tuple[str, str]], ks: List[int]
+) -> Dict:
+    hits = {k: 0 for k in ks}
+    reciprocal_ranks = []
+    latencies = []
+
+    for query, title in queries:
+        started = time.perf_counter()
+        titles = [doc.metadata.get("title") for doc in retriever.retrieve(query)]
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        rank = titles.index(title) + 1 if title in titles else None
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+        for k in ks:
+            hits[k] += rank is not None and rank <= k
+
+    return {
+        "queries": len(queries),
+        "mode": settings.RETRIEVAL_MODE,
+        **{f"recall@{k}": hits[k] / len(queries) for k in ks},
+        "mrr": float(np.mean(reciprocal_ranks)),
+        "retrieve_ms": _percentiles(latencies),
+    }
+
+
+def _latency(
+    chain: RAGChain,
+    queries: List[str],
+    users: int,
+    web: bool,
+    wikipedia: bool,
+) -> Dict:
+    sink = MemorySink(len(queries))
+    tracer.sinks.append(sink)
+
+    def ask(query: str) -> float:
+        started = time.perf_counter()
+        chain.run(query, web, wikipedia)
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=users) as pool:
+            latencies = list(pool.map(ask, queries))
+    finally:
+        tracer.sinks.remove(sink)
+    elapsed = time.perf_counter() - started
+
+    # Total time per stage within each answer, then percentiles across answers
+    stages: Dict[str, List[float]] = {}
+    for trace in sink.traces:
+        totals: Dict[str, float] = {}
+        for span in trace.spans[1:]:
+            totals[span.name] = totals.get(span.name, 0.0) + (span.duration_ms or 0)
+        for name, total in totals.items():
+            stages.setdefault(name, []).append(total)
+
+    return {
+        "users": users,
+        "queries": len(queries),
+        "queries_per_s": len(queries) / elapsed,
+        "latency_ms": _percentiles(latencies),
+        "stages_ms": {name: _percentiles(v) for name, v in sorted(stages.items())},
+    }
+
+
+def _git_commit() -> str:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return result.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--add-documents", type=int, default=20)
+    parser.add_argument("--words", type=int, default=1200, help="per document")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--k", type=int, nargs="+", default=[1, settings.TOP_K])
+    parser.add_argument("--embeddings", choices=["hashing", "model"], default="hashing")
+    parser.add_argument("--web", action="store_true", help="include simulated web")
+    parser.add_argument("--wikipedia", action="store_true")
+    parser.add_argument("--llm-ms", type=float, default=300)
+    parser.add_argument("--web-ms", type=float, default=400)
+    parser.add_argument("--wikipedia-ms", type=float, default=250)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="-")
+    args = parser.parse_args()
+
+    output = args.output if args.output == "-" else os.path.abspath(args.output)
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "started": time.time(),
+            "args": vars(args),
+            "settings": {
+                name: getattr(settings, name)
+                for name in (
+                    "CHUNK_SIZE",
+                    "CHUNK_OVERLAP",
+                    "TOP_K",
+                    "RETRIEVAL_MODE",
+                    "INDEX_TYPE",
+                    "INGEST_WORKERS",
+                    "INGEST_BATCH_SIZE",
+                )
+            },
+        }
+    }
+
+    # Store, caches and corpus all live under data/ relative to the cwd
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+
+        if args.embeddings == "hashing":
+            embedding = HashingEmbeddingProvider()
+        else:
+            embedding = get_embedding_provider()
+        store = VectorStoreService(embedding)
+
+        corpus = make_corpus(
+            os.path.join(workdir, "corpus"),
+            args.documents,
+            args.words,
+            args.queries,
+            args.seed,
+        )
+        results["ingest"] = _ingest(store, corpus.files)
+
+        added = make_corpus(
+            os.path.join(workdir, "corpus"),
+            args.add_documents,
+            args.words,
+            queries=0,
+            seed=args.seed,
+            start=args.documents,
+        )
+        results["incremental_add"] = _incremental(store, added.files)
+
+        retriever = RetrieverService(store)
+        results["recall"] = _recall(
+            retriever, corpus.queries, sorted(k for k in args.k if k <= settings.TOP_K)
+        )
+
+        chain = RAGChain(
+            retriever,
+            llm=FakeLLMProvider(
+                SimulatedLatency(args.llm_ms, args.jitter_ms, args.seed)
+            ),
+            web_search=FakeTavilySearch(
+                SimulatedLatency(args.web_ms, args.jitter_ms, args.seed)
+            ),
+            wiki_loader=FakeWikipediaLoader(
+                SimulatedLatency(args.wikipedia_ms, args.jitter_ms, args.seed)
+            ),
+        )
+        results["query_latency"] = [
+            # A distinct suffix per level keeps every cache cold
+            _latency(
+                chain,
+                [f"{query} [{users} users]" for query, _ in corpus.queries],
+                users,
+                args.web,
+                args.wikipedia,
+            )
+            for users in args.concurrency
+        ]
+
+    text = json.dumps(results, indent=2)
+    if output == "-":
+        sys.stdout.write(text + "\n")
+    else:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Cost of the tracing calls placed along the RAG pipeline: per span while
+tracing is off, on but outside a trace, and recording into a trace.
+
+    python -m benchmarks.tracing_overhead --spans 200000
+"""
+
+import argparse
+import json
+import time
+
+from core.tracing import MemorySink, Tracer
+
+
+def _per_span_ns(tracer: Tracer, spans: int, inside_trace: bool) -> float:
+    def run():
+        started = time.perf_counter_ns()
+        for _ in range(spans):
+            with tracer.span("stage", k=8) as span:
+                span.set(cache_hit=False)
+        return (time.perf_counter_ns() - started) / spans
+
+    if not inside_trace:
+        return run()
+    with tracer.trace("root"):
+        return run()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spans", type=int, default=200000)
+    args = parser.parse_args()
+
+    results = {
+        "off_ns": _per_span_ns(Tracer(enabled=False), args.spans, True),
+        "on_outside_trace_ns": _per_span_ns(Tracer(), args.spans, False),
+        "on_recording_ns": _per_span_ns(Tracer([MemorySink()]), args.spans, True),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,27 +6,97 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-def _validate_env(var_name: str) -> str:
-    value = os.getenv(var_name)
-    if not value:
-        raise EnvironmentError(f"Missing required environment variable: {var_name}")
-    return value
-
-
 @dataclass(frozen=True)
 class AppSettings:
     # Chunking
     CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", 800))
     CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", 150))
+    # Uploaded documents: recursive | semantic (split at topic shifts found
+    # with the embedding model; CHUNK_SIZE is then the upper bound)
+    CHUNKING_MODE: str = os.getenv("CHUNKING_MODE", "recursive")
+    SEMANTIC_BREAKPOINT_PERCENTILE: float = float(
+        os.getenv("SEMANTIC_BREAKPOINT_PERCENTILE", 95)
+    )
+    SEMANTIC_MIN_CHUNK_CHARS: int = int(os.getenv("SEMANTIC_MIN_CHUNK_CHARS", 400))
+
+    # Ingestion
+    INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", min(4, os.cpu_count() or 1)))
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", 256))
+    # Files this large are chunked and embedded as a stream, never held whole
+    INGEST_STREAM_MIN_BYTES: int = int(os.getenv("INGEST_STREAM_MIN_BYTES", 16 << 20))
+    TEXT_BLOCK_CHARS: int = int(os.getenv("TEXT_BLOCK_CHARS", 1 << 20))
+    # PDF text extraction: pypdfium2 | pymupdf | pypdf. Pages of one long
+    # file are split across PDF_WORKERS processes in PDF_PAGES_PER_TASK ranges
+    PDF_BACKEND: str = os.getenv("PDF_BACKEND", "pypdfium2")
+    PDF_WORKERS: int = int(os.getenv("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+    PDF_PAGES_PER_TASK: int = int(os.getenv("PDF_PAGES_PER_TASK", 16))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 64))
 
     # Retrieval
     TOP_K: int = int(os.getenv("TOP_K", 4))
-
-    # Embeddings (free / local-first)
+    RETRIEVAL_MODE: str = os.getenv("RETRIEVAL_MODE", "hybrid")  # hybrid | vector
+    HYBRID_FETCH_K: int = int(os.getenv("HYBRID_FETCH_K", 20))
+    RRF_K: int = int(os.getenv("RRF_K", 60))
+
+    # Source fan-out (per-source timeouts in seconds)
+    RETRIEVAL_WORKERS: int = int(os.getenv("RETRIEVAL_WORKERS", 8))
+    DOCUMENT_TIMEOUT: float = float(os.getenv("DOCUMENT_TIMEOUT", 5))
+    WEB_TIMEOUT: float = float(os.getenv("WEB_TIMEOUT", 8))
+    WIKIPEDIA_TIMEOUT: float = float(os.getenv("WIKIPEDIA_TIMEOUT", 8))
+
+    # Web tools
+    HTTP_POOL_SIZE: int = int(os.getenv("HTTP_POOL_SIZE", 16))
+    # Per attempt; lookups split their source deadline across the retries
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", 10))
+    HTTP_RETRIES: int = int(os.getenv("HTTP_RETRIES", 2))
+    WIKIPEDIA_MAX_CHARS: int = int(os.getenv("WIKIPEDIA_MAX_CHARS", 4000))
+    WEB_CACHE_TTL: float = float(os.getenv("WEB_CACHE_TTL", 3600))
+    WEB_CACHE_STALE_TTL: float = float(os.getenv("WEB_CACHE_STALE_TTL", 86400))
+    # Wikipedia/web passages that reach the prompt (token budget and count)
+    EXTERNAL_CONTEXT_TOKENS: int = int(os.getenv("EXTERNAL_CONTEXT_TOKENS", 1200))
+    EXTERNAL_TOP_K: int = int(os.getenv("EXTERNAL_TOP_K", 6))
+
+    # Vector store
+    REBUILD_TOMBSTONE_RATIO: float = float(os.getenv("REBUILD_TOMBSTONE_RATIO", 0.3))
+    INDEX_TYPE: str = os.getenv("INDEX_TYPE", "flat")  # flat | hnsw | ivfpq | sq
+    INDEX_TRAIN_SAMPLE: int = int(os.getenv("INDEX_TRAIN_SAMPLE", 50000))
+    # Quantized indexes retrain once the store is this many times the number
+    # of vectors they were trained on (until that reaches INDEX_TRAIN_SAMPLE)
+    INDEX_RETRAIN_GROWTH: float = float(os.getenv("INDEX_RETRAIN_GROWTH", 4))
+    HNSW_M: int = int(os.getenv("HNSW_M", 32))
+    HNSW_EF_CONSTRUCTION: int = int(os.getenv("HNSW_EF_CONSTRUCTION", 200))
+    HNSW_EF_SEARCH: int = int(os.getenv("HNSW_EF_SEARCH", 64))
+    IVF_NLIST: int = int(os.getenv("IVF_NLIST", 0))  # 0 = 4 * sqrt(n)
+    IVF_NPROBE: int = int(os.getenv("IVF_NPROBE", 16))
+    PQ_M: int = int(os.getenv("PQ_M", 48))
+    PQ_NBITS: int = int(os.getenv("PQ_NBITS", 8))
+    SQ_TYPE: str = os.getenv("SQ_TYPE", "8bit")  # 8bit | 6bit | 4bit | fp16
+    INDEX_MMAP: bool = os.getenv("INDEX_MMAP", "true").lower() == "true"
+    DOCSTORE_CACHE_ITEMS: int = int(os.getenv("DOCSTORE_CACHE_ITEMS", 4096))
+    # Unsaved chunk records written to disk at a time during bulk ingest
+    DOCSTORE_FLUSH_ITEMS: int = int(os.getenv("DOCSTORE_FLUSH_ITEMS", 4096))
+
+    # Embeddings (free / local-first); "onnx" runs the same model int8-quantized
     EMBEDDING_PROVIDER: str = os.getenv("EMBEDDING_PROVIDER", "huggingface")
     EMBEDDING_MODEL: str = os.getenv(
         "EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
     )
+    EMBEDDING_CACHE_ENABLED: bool = (
+        os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    )
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = int(
+        os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", 20000)
+    )
+    # Concurrent query embeddings share one forward pass
+    QUERY_BATCHING_ENABLED: bool = (
+        os.getenv("QUERY_BATCHING_ENABLED", "true").lower() == "true"
+    )
+    QUERY_BATCH_MAX_SIZE: int = int(os.getenv("QUERY_BATCH_MAX_SIZE", 32))
+    QUERY_BATCH_MAX_WAIT_MS: float = float(os.getenv("QUERY_BATCH_MAX_WAIT_MS", 2))
+    # Kernel set for int8 quantization: arm64, avx2, avx512 or avx512_vnni
+    ONNX_QUANTIZATION: str = os.getenv("ONNX_QUANTIZATION", "avx2")
+    # 0 lets ONNX Runtime use one thread per physical core
+    ONNX_THREADS: int = int(os.getenv("ONNX_THREADS", 0))
 
     # LLM (Groq)
     LLM_PROVIDER: str = "groq"
@@ -34,18 +104,55 @@ class AppSettings:
     LLM_TEMPERATURE: float = 0.6
 
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", 768))
+    # Input budget for retrieved context, counted with core.llm.count_tokens
+    CONTEXT_MAX_TOKENS: int = int(os.getenv("CONTEXT_MAX_TOKENS", 3000))
+    # tiktoken encoding for token counts; Llama 3's vocabulary extends cl100k
+    TOKENIZER_ENCODING: str = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+
+    # Batch answering (run_batch / main.py batch)
+    BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", 64))
+    BATCH_LLM_CONCURRENCY: int = int(os.getenv("BATCH_LLM_CONCURRENCY", 4))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 5))
+    LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", 1.0))
+
+    # Routing (cosine margin the local classifier needs to skip the LLM)
+    ROUTER_CONFIDENCE_THRESHOLD: float = float(
+        os.getenv("ROUTER_CONFIDENCE_THRESHOLD", 0.08)
+    )
+
+    # Response caching (seconds)
+    CACHE_MAX_ITEMS: int = int(os.getenv("CACHE_MAX_ITEMS", 512))
+    ROUTE_CACHE_TTL: float = float(os.getenv("ROUTE_CACHE_TTL", 86400))
+    ANSWER_CACHE_TTL: float = float(os.getenv("ANSWER_CACHE_TTL", 3600))
+    WEB_ANSWER_CACHE_TTL: float = float(os.getenv("WEB_ANSWER_CACHE_TTL", 300))
+
+    # Tracing; sinks are any of memory, jsonl, otel
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACE_SINKS: str = os.getenv("TRACE_SINKS", "memory")
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", 200))
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "data/traces/spans.jsonl")
 
-    # API Keys
-    GROQ_API_KEY: str = _validate_env("GROQ_API_KEY")
+    # API Keys, checked by `require` when a client first needs them, so
+    # offline tools and benchmarks run without them
+    GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
 
     # Tavily
-    TAVILY_API_KEY: str = _validate_env("TAVILY_API_KEY")
+    TAVILY_API_KEY: str = os.getenv("TAVILY_API_KEY", "")
 
     # Safety
     ALLOW_TOOLS: bool = False
 
     UPLOAD_DIR = "data/uploads"
     FAISS_DIR = "data/faiss"
+    EMBEDDING_CACHE_DIR = "data/embeddings"
+    ONNX_MODEL_DIR = "data/onnx"
+    WEB_CACHE_DIR = "data/web_cache"
+
+    def require(self, name: str) -> str:
+        value = getattr(self, name)
+        if not value:
+            raise EnvironmentError(f"Missing required environment variable: {name}")
+        return value
 
 
 settings = AppSettings()
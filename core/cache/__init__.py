@@ -0,0 +1,5 @@
+from .keys import normalize_query
+from .lru import LRUCache
+from .response import ResponseCache, web_response_cache
+
+__all__ = ["LRUCache", "ResponseCache", "normalize_query", "web_response_cache"]
@@ -0,0 +1,7 @@
+import re
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+
+def normalize_query(query: str) -> str:
+    return _TRAILING_PUNCTUATION.sub("", " ".join(query.lower().split()))
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from config import settings
+from core.tracing import tracer
+
+from .lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    TTL cache for JSON-serializable tool responses with stale-while-revalidate.
+
+    Entries younger than `ttl` are served directly. Entries up to
+    `ttl + stale_ttl` old are still served, but trigger a single background
+    refresh. Older entries are refetched inline. Values live in an
+    in-memory LRU backed by a sqlite file, so they survive restarts; rows
+    past `ttl + stale_ttl` are deleted as new ones are written.
+
+    Sources sharing a file share one instance (see `web_response_cache`)
+    and keep their keys apart by namespace.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        stale_ttl: float,
+        max_memory_items: int,
+    ):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.memory = LRUCache(max_memory_items)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value TEXT, stored_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)"
+        )
+        self._lock = threading.Lock()
+        self._refreshing: Set[str] = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="response-refresh"
+        )
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get_or_fetch(
+        self,
+        namespace: str,
+        key_parts: Tuple[Hashable, ...],
+        fetch: Callable[[], Any],
+    ):
+        key = f"{namespace}:{json.dumps(key_parts)}"
+        entry = self._get(key)
+
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+
+            if age < self.ttl:
+                self.hits += 1
+                tracer.annotate(cache="hit")
+                return value
+
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                tracer.annotate(cache="stale")
+                self._refresh(key, fetch)
+                return value
+
+        self.misses += 1
+        tracer.annotate(cache="miss")
+        value = fetch()
+        self._put(key, value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+    def _get(self, key: str) -> Optional[Tuple[Any, float]]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        entry = (json.loads(row[0]), row[1])
+        self.memory.put(key, entry)
+        return entry
+
+    def _put(self, key: str, value: Any) -> None:
+        stored_at = time.time()
+        self.memory.put(key, (value, stored_at))
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, stored_at) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(value), stored_at),
+            )
+            # Never served again, stale or not
+            self._conn.execute(
+                "DELETE FROM responses WHERE stored_at < ?",
+                (stored_at - self.ttl - self.stale_ttl,),
+            )
+            self._conn.commit()
+
+    def _refresh(self, key: str, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._put(key, fetch())
+            except Exception:
+                logger.warning("Background refresh failed for %s", key)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(run)
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def web_response_cache() -> ResponseCache:
+    """The cache of web and Wikipedia responses, one per file per process."""
+    path = os.path.join(settings.WEB_CACHE_DIR, "cache.sqlite")
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = ResponseCache(
+                path,
+                settings.WEB_CACHE_TTL,
+                settings.WEB_CACHE_STALE_TTL,
+                settings.CACHE_MAX_ITEMS,
+            )
+        return _caches[path]
@@ -0,0 +1,149 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from config import settings
+from core.llm import count_tokens
+
+# Shorter suffix/prefix matches between neighbours are treated as chance
+MIN_OVERLAP_CHARS = 16
+
+
+@dataclass
+class AssembledContext:
+    documents: List[Document] = field(default_factory=list)
+    candidates: int = 0
+    dropped: int = 0
+    merged: int = 0
+    trimmed_chars: int = 0
+    context_tokens: int = 0
+
+
+def _overlap(previous: str, text: str, max_chars: int) -> int:
+    """Length of the longest prefix of `text` that ends `previous`."""
+    for size in range(min(max_chars, len(previous), len(text)), 0, -1):
+        if size < MIN_OVERLAP_CHARS:
+            return 0
+        if previous.endswith(text[:size]):
+            return size
+    return 0
+
+
+class ContextAssembler:
+    """
+    Packs ranked passages into a fixed input-token budget.
+
+    Each source list arrives best first; passages are taken by reciprocal
+    rank across lists, as in hybrid retrieval, until the budget is spent.
+    Neighbouring chunks of the same document are then joined back together
+    with the text they share through CHUNK_OVERLAP removed, so the saved
+    tokens go to further passages instead.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = settings.CONTEXT_MAX_TOKENS,
+        overlap_chars: int = settings.CHUNK_OVERLAP,
+    ):
+        self.max_tokens = max_tokens
+        self.overlap_chars = overlap_chars
+
+    def assemble(self, ranked_lists: Sequence[List[Document]]) -> AssembledContext:
+        candidates = sorted(
+            (
+                (rank, list_index, doc)
+                for list_index, docs in enumerate(ranked_lists)
+                for rank, doc in enumerate(docs)
+            ),
+            key=lambda item: item[:2],
+        )
+        result = AssembledContext(candidates=len(candidates))
+
+        selected: Dict[Tuple, Document] = {}
+        order: List[Tuple] = []
+        used = 0
+
+        for _, _, doc in candidates:
+            position = self._position(doc)
+            if position is not None and position in selected:
+                continue
+
+            text = doc.page_content
+            previous = selected.get(self._neighbour(position, -1))
+            if previous is not None:
+                text = text[_overlap(previous.page_content, text, self.overlap_chars) :]
+
+            tokens = count_tokens(text)
+            if used + tokens > self.max_tokens:
+                result.dropped += 1
+                continue
+
+            used += tokens
+            key = position if position is not None else ("passage", len(order))
+            selected[key] = doc
+            order.append(key)
+
+        result.documents = self._merge(selected, order, result)
+        result.context_tokens = sum(
+            count_tokens(doc.page_content) for doc in result.documents
+        )
+        return result
+
+    def _merge(
+        self, selected: Dict[Tuple, Document], order: List[Tuple], result
+    ) -> List[Document]:
+        # Runs of consecutive chunks collapse into the best-ranked one's slot
+        merged: List[Document] = []
+        absorbed = set()
+
+        for key in order:
+            if key in absorbed:
+                continue
+
+            start = key
+            while self._neighbour(start, -1) in selected:
+                start = self._neighbour(start, -1)
+
+            run = [start]
+            while self._neighbour(run[-1], 1) in selected:
+                run.append(self._neighbour(run[-1], 1))
+            absorbed.update(run)
+
+            if len(run) == 1:
+                merged.append(selected[key])
+                continue
+
+            text = selected[run[0]].page_content
+            for part in run[1:]:
+                part_text = selected[part].page_content
+                shared = _overlap(text, part_text, self.overlap_chars)
+                result.trimmed_chars += shared
+                text += part_text[shared:]
+
+            result.merged += len(run) - 1
+            merged.append(
+                Document(
+                    page_content=text,
+                    metadata={
+                        **selected[run[0]].metadata,
+                        "chunk_indices": [p[-1] for p in run],
+                    },
+                )
+            )
+
+        return merged
+
+    @staticmethod
+    def _position(doc: Document) -> Optional[Tuple]:
+        metadata = doc.metadata
+        owner = metadata.get("doc_id") or metadata.get("url")
+        if owner is None or metadata.get("chunk_index") is None:
+            return None
+        return (owner, metadata.get("page"), metadata["chunk_index"])
+
+    @staticmethod
+    def _neighbour(position: Optional[Tuple], step: int) -> Optional[Tuple]:
+        if position is None or position[0] == "passage":
+            return None
+        return (*position[:-1], position[-1] + step)
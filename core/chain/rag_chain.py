@@ -1,57 +1,540 @@
-from typing import List
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from langchain_core.messages import HumanMessage, SystemMessage
+import numpy as np
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
-from core.llm import get_llm_provider
-from core.retriever import RetrieverService
+from config import settings
+from core.cache import LRUCache, normalize_query
+from core.document import WikipediaDocumentLoader
+from core.llm import LLMProvider, count_tokens, get_llm_provider, invoke_with_backoff
+from core.retriever import PassageReranker, RetrieverService
 from core.router import QueryRouter, QueryType
+from core.tracing import tracer
 from tools.tavily_search import TavilySearchService
 
+from .context import ContextAssembler
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_ROUTES = {QueryType.DOCUMENT, QueryType.HYBRID}
+
+
+@dataclass
+class PreparedAnswer:
+    # Either messages for the LLM or a fixed answer that needs no generation
+    messages: Optional[List[BaseMessage]] = None
+    answer: Optional[str] = None
+    sources: List[str] = field(default_factory=list)
+    web_backed: bool = False
+    # False when a source timed out or failed, so the answer is not reused
+    cacheable: bool = True
+    usage: Dict[str, int] = field(default_factory=dict)
+
+
+class _Lookup:
+    """
+    A source lookup on the shared pool. Its deadline counts from when a
+    worker picks it up, so time spent queued behind other requests is not
+    charged to it.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, fn, *args):
+        self.started: Optional[float] = None
+        self.future: Future = executor.submit(self._run, fn, *args)
+
+    def _run(self, fn, *args):
+        self.started = time.monotonic()
+        return fn(*args)
+
+    def result(self, timeout: float, submitted: float) -> Any:
+        """
+        Wait until `timeout` after the lookup started, or after `submitted`
+        while it has not. Raises FutureTimeoutError either way; `started`
+        tells the two apart. A lookup given up on in the queue is cancelled.
+        """
+        while True:
+            started = self.started
+            deadline = (submitted if started is None else started) + timeout
+            try:
+                return self.future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                if started is None and self.started is not None:
+                    continue
+                if self.started is None:
+                    self.future.cancel()
+                raise
+
+    def cancel(self) -> None:
+        # Only a lookup still queued is stopped; a running one finishes on
+        # its own and its result is never read
+        self.future.cancel()
+
 
 class RAGChain:
-    def __init__(self, retriever_service: RetrieverService):
+    def __init__(
+        self,
+        retriever_service: RetrieverService,
+        llm: Optional[LLMProvider] = None,
+        web_search: Optional[TavilySearchService] = None,
+        wiki_loader: Optional[WikipediaDocumentLoader] = None,
+    ):
         self.retriever_service = retriever_service
-        self.llm = get_llm_provider()
-        self.router = QueryRouter()
+        self.embedding_provider = (
+            retriever_service.vector_store_service.embedding_provider
+        )
+        self.llm = llm or get_llm_provider()
+        self.router = QueryRouter(self.embedding_provider, self.llm)
+        self.wiki_loader = wiki_loader or WikipediaDocumentLoader()
+        self.web_search = web_search or TavilySearchService()
+        self.reranker = PassageReranker(
+            self.embedding_provider,
+            settings.EXTERNAL_CONTEXT_TOKENS,
+            settings.EXTERNAL_TOP_K,
+        )
+        self.assembler = ContextAssembler()
 
-    def run(self, query: str, web_enabled: bool = False, extra_docs: List = None):
+        self.route_cache = LRUCache(settings.CACHE_MAX_ITEMS, settings.ROUTE_CACHE_TTL)
+        self.answer_cache = LRUCache(
+            settings.CACHE_MAX_ITEMS, settings.ANSWER_CACHE_TTL
+        )
 
-        route = self.router.route(query, web_enabled)
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.RETRIEVAL_WORKERS, thread_name_prefix="rag-source"
+        )
+        self.source_timeouts = {
+            "documents": settings.DOCUMENT_TIMEOUT,
+            "wikipedia": settings.WIKIPEDIA_TIMEOUT,
+            "web": settings.WEB_TIMEOUT,
+        }
 
-        # GREETING
-        if route.query_type == QueryType.GREETING:
-            answer = self.llm.invoke(
-                [
-                    SystemMessage(
-                        content="You are a helpful assistant. Keep replies short."
-                    ),
-                    HumanMessage(content=query),
-                ]
+    def run(
+        self,
+        query: str,
+        web_enabled: bool = False,
+        include_wikipedia: bool = False,
+        extra_docs: List = None,
+    ):
+        with tracer.trace("answer", web=web_enabled, wikipedia=include_wikipedia):
+            cache_key = self._cache_key(
+                query, web_enabled, include_wikipedia, extra_docs
             )
-            return {"answer": answer, "sources": []}
+            cached = self._cached_answer(cache_key)
+            tracer.annotate(answer_cache_hit=cached is not None)
+            if cached is not None:
+                return cached
 
-        context_docs = []
+            prepared = self._prepare(query, web_enabled, include_wikipedia, extra_docs)
 
-        if extra_docs:
-            context_docs.extend(extra_docs)
+            answer = prepared.answer
+            if prepared.messages is not None:
+                with tracer.span(
+                    "generation", input_tokens=prepared.usage["input_tokens"]
+                ) as span:
+                    answer = self.llm.invoke(prepared.messages)
+                    span.set(output_tokens=count_tokens(answer))
+
+            result = {"answer": answer, "sources": prepared.sources}
+            if prepared.cacheable:
+                self._cache_answer(cache_key, result, prepared.web_backed)
+            return {**result, "usage": prepared.usage}
+
+    def run_stream(
+        self,
+        query: str,
+        web_enabled: bool = False,
+        include_wikipedia: bool = False,
+        extra_docs: List = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a single {"type": "sources"} event (with the request's token
+        usage) followed by {"type": "token"} events as the answer is generated.
+        Spans are recorded under the caller's trace, if one is open.
+        """
+        cache_key = self._cache_key(query, web_enabled, include_wikipedia, extra_docs)
+        cached = self._cached_answer(cache_key)
+        tracer.annotate(answer_cache_hit=cached is not None)
+        if cached is not None:
+            yield {
+                "type": "sources",
+                "sources": cached["sources"],
+                "usage": cached["usage"],
+            }
+            yield {"type": "token", "content": cached["answer"]}
+            return
+
+        prepared = self._prepare(query, web_enabled, include_wikipedia, extra_docs)
+        yield {
+            "type": "sources",
+            "sources": prepared.sources,
+            "usage": prepared.usage,
+        }
+
+        if prepared.messages is None:
+            tokens = [prepared.answer]
+            yield {"type": "token", "content": prepared.answer}
+        else:
+            tokens = []
+            # Ended by hand: a with-block would hold the span across yields
+            span = tracer.span(
+                "generation", input_tokens=prepared.usage["input_tokens"]
+            )
+            try:
+                for token in self.llm.stream(prepared.messages):
+                    if not tokens:
+                        span.set(first_token_ms=span.elapsed_ms)
+                    tokens.append(token)
+                    yield {"type": "token", "content": token}
+            finally:
+                span.set(output_tokens=count_tokens("".join(tokens)))
+                span.end()
+
+        result = {"answer": "".join(tokens), "sources": prepared.sources}
+        if prepared.cacheable:
+            self._cache_answer(cache_key, result, prepared.web_backed)
+
+    def run_batch(
+        self,
+        queries: Sequence[str],
+        web_enabled: bool = False,
+        include_wikipedia: bool = False,
+        batch_size: int = settings.BATCH_SIZE,
+        concurrency: int = settings.BATCH_LLM_CONCURRENCY,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Answer many queries, yielding one result dict (with its input
+        `index`) per query as it completes. Queries are prepared `batch_size`
+        at a time while at most `concurrency` LLM calls run. A query whose
+        LLM call keeps failing yields an "error" instead of stopping the batch.
+        """
+        in_flight: Dict[Future, Tuple[int, str, Any, PreparedAnswer]] = {}
+
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="rag-batch"
+        ) as pool:
+            for start in range(0, len(queries), batch_size):
+                group = queries[start : start + batch_size]
+                prepared_group = self._prepare_batch(
+                    group, web_enabled, include_wikipedia
+                )
+
+                for offset, (cache_key, prepared) in enumerate(prepared_group):
+                    index, query = start + offset, group[offset]
+
+                    if isinstance(prepared, dict):
+                        yield {"index": index, "query": query, **prepared}
+                    elif prepared.messages is None:
+                        yield self._batch_result(
+                            index, query, cache_key, prepared, prepared.answer
+                        )
+                    else:
+                        future = pool.submit(
+                            invoke_with_backoff,
+                            self.llm,
+                            prepared.messages,
+                            settings.LLM_MAX_RETRIES,
+                            settings.LLM_BACKOFF_BASE,
+                        )
+                        in_flight[future] = (index, query, cache_key, prepared)
+
+                # Keep preparing ahead, but never more than one batch waiting
+                yield from self._finish(in_flight, limit=batch_size)
+
+            yield from self._finish(in_flight, limit=0)
+
+    def _finish(
+        self, in_flight: Dict[Future, Tuple], limit: int
+    ) -> Iterator[Dict[str, Any]]:
+        while in_flight:
+            done = [future for future in in_flight if future.done()]
+            if not done:
+                if len(in_flight) <= limit:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index, query, cache_key, prepared = in_flight.pop(future)
+                try:
+                    answer = future.result()
+                except Exception as exc:
+                    logger.error("Batch query %d failed: %s", index, exc)
+                    yield {"index": index, "query": query, "error": str(exc)}
+                else:
+                    yield self._batch_result(index, query, cache_key, prepared, answer)
+
+    def _batch_result(
+        self, index: int, query: str, cache_key, prepared: PreparedAnswer, answer: str
+    ) -> Dict[str, Any]:
+        result = {"answer": answer, "sources": prepared.sources}
+        if prepared.cacheable:
+            self._cache_answer(cache_key, result, prepared.web_backed)
+        return {"index": index, "query": query, **result, "usage": prepared.usage}
+
+    def _prepare_batch(
+        self, queries: Sequence[str], web_enabled: bool, include_wikipedia: bool
+    ) -> List[Tuple[Any, Any]]:
+        """
+        Prepare a group of queries with one embedding call and one FAISS
+        search. Identical queries share their web and Wikipedia lookups.
+        Returns (cache_key, cached result dict or PreparedAnswer) pairs.
+        """
+        with tracer.trace("prepare_batch", queries=len(queries)):
+            return self._prepare_group(queries, web_enabled, include_wikipedia)
+
+    def _prepare_group(
+        self, queries: Sequence[str], web_enabled: bool, include_wikipedia: bool
+    ) -> List[Tuple[Any, Any]]:
+        keys = [self._cache_key(q, web_enabled, include_wikipedia) for q in queries]
+        prepared: List[Any] = [self._cached_answer(key) for key in keys]
+        todo = [i for i, cached in enumerate(prepared) if cached is None]
+        tracer.annotate(answer_cache_hits=len(queries) - len(todo))
+        if not todo:
+            return list(zip(keys, prepared))
+
+        submitted = time.monotonic()
+        external: Dict[Tuple[str, str], _Lookup] = {}
+        for i in todo:
+            normalized = normalize_query(queries[i])
+            if include_wikipedia and ("wikipedia", normalized) not in external:
+                external["wikipedia", normalized] = _Lookup(
+                    self.executor, tracer.propagate(self.wiki_loader.load), queries[i]
+                )
+            if web_enabled and ("web", normalized) not in external:
+                external["web", normalized] = _Lookup(
+                    self.executor, tracer.propagate(self.web_search.search), queries[i]
+                )
+
+        vectors = dict(
+            zip(
+                todo,
+                np.asarray(
+                    self.embedding_provider.embed_queries([queries[i] for i in todo]),
+                    dtype=np.float32,
+                ),
+            )
+        )
+        routes = {i: self._route(queries[i], web_enabled, vectors[i]) for i in todo}
 
-        # DOCUMENT (only if docs exist)
-        if route.query_type in {QueryType.DOCUMENT, QueryType.HYBRID}:
+        documents: Dict[int, List] = {}
+        needs_documents = [i for i in todo if routes[i].query_type in DOCUMENT_ROUTES]
+        if needs_documents:
             try:
-                retriever = self.retriever_service.build_retriever()
-                context_docs.extend(retriever.invoke(query))
+                retrieved = self.retriever_service.retrieve_batch(
+                    [queries[i] for i in needs_documents],
+                    np.stack([vectors[i] for i in needs_documents]),
+                )
+                documents = dict(zip(needs_documents, retrieved))
             except RuntimeError:
                 pass
 
-        # WEB (always allowed if enabled)
+        # Wait for the lookups together, no longer than the longest source
+        # deadline; each query then collects its own within its deadlines
+        wait(
+            [lookup.future for lookup in external.values()],
+            timeout=max(settings.WEB_TIMEOUT, settings.WIKIPEDIA_TIMEOUT),
+        )
+
+        for i in todo:
+            if routes[i].query_type == QueryType.GREETING:
+                prepared[i] = self._greeting(queries[i])
+                continue
+
+            normalized = normalize_query(queries[i])
+            pending = {
+                name: lookup
+                for (name, key), lookup in external.items()
+                if key == normalized
+            }
+            results = self._collect(pending, submitted)
+            results["documents"] = documents.get(i, [])
+
+            prepared[i] = self._compose(
+                queries[i],
+                results,
+                web_backed=web_enabled or include_wikipedia,
+                cacheable=len(results) == len(pending) + 1,
+                query_vector=vectors[i],
+            )
+
+        return list(zip(keys, prepared))
+
+    def _cache_key(
+        self,
+        query: str,
+        web_enabled: bool,
+        include_wikipedia: bool,
+        extra_docs: List = None,
+    ):
+        if extra_docs:
+            return None
+
+        # Answers are only reusable while the corpus they were built on is
+        # unchanged, so the store version is part of the key.
+        return (
+            normalize_query(query),
+            web_enabled,
+            include_wikipedia,
+            self.retriever_service.vector_store_service.version,
+        )
+
+    def _cached_answer(self, cache_key) -> Optional[Dict[str, Any]]:
+        if cache_key is None:
+            return None
+        cached = self.answer_cache.get(cache_key)
+        if cached is None:
+            return None
+        # Nothing is sent to the LLM for a cached answer
+        return {**cached, "usage": {"input_tokens": 0, "cached": 1}}
+
+    def _cache_answer(self, cache_key, result: Dict[str, Any], web_backed: bool):
+        if cache_key is None:
+            return
+        ttl = settings.WEB_ANSWER_CACHE_TTL if web_backed else None
+        self.answer_cache.put(cache_key, result, ttl)
+
+    def _retrieve_documents(self, query: str) -> List:
+        try:
+            return self.retriever_service.retrieve(query)
+        except RuntimeError:
+            return []
+
+    def _collect(
+        self, pending: Dict[str, _Lookup], submitted: float
+    ) -> Dict[str, List]:
+        """
+        Wait for each source up to its own deadline; failures degrade to [].
+        The trace tells sources that ran out of time from ones that never
+        left the queue.
+        """
+        results: Dict[str, List] = {}
+
+        with tracer.span("sources") as span:
+            for name, lookup in pending.items():
+                try:
+                    results[name] = lookup.result(self.source_timeouts[name], submitted)
+                except FutureTimeoutError:
+                    outcome = "queued" if lookup.started is None else "timed_out"
+                    logger.warning("%s source %s, answering without it", name, outcome)
+                    span.set(**{name: outcome})
+                except Exception:
+                    logger.exception("%s source failed, answering without it", name)
+                    span.set(**{name: "failed"})
+                else:
+                    span.set(**{name: "ok"})
+
+        return results
+
+    def _route(
+        self,
+        query: str,
+        web_enabled: bool,
+        query_vector: Optional[Sequence[float]] = None,
+    ):
+        key = (normalize_query(query), web_enabled)
+        with tracer.span("route") as span:
+            route = self.route_cache.get(key)
+            span.set(cache_hit=route is not None)
+            if route is None:
+                route = self.router.route(query, web_enabled, query_vector)
+                self.route_cache.put(key, route)
+            span.set(query_type=route.query_type.value, tier=route.tier)
+        return route
+
+    def _prepare(
+        self,
+        query: str,
+        web_enabled: bool,
+        include_wikipedia: bool,
+        extra_docs: List = None,
+    ) -> PreparedAnswer:
+        # Sources are independent I/O, so they start together with routing;
+        # document retrieval is speculative and dropped if the route skips it.
+        submitted = time.monotonic()
+        pending: Dict[str, _Lookup] = {
+            "documents": _Lookup(
+                self.executor, tracer.propagate(self._retrieve_documents), query
+            )
+        }
+        if include_wikipedia:
+            pending["wikipedia"] = _Lookup(
+                self.executor, tracer.propagate(self.wiki_loader.load), query
+            )
         if web_enabled:
-            context_docs.extend(TavilySearchService().search(query))
+            pending["web"] = _Lookup(
+                self.executor, tracer.propagate(self.web_search.search), query
+            )
+
+        route = self._route(query, web_enabled)
+
+        # GREETING
+        if route.query_type == QueryType.GREETING:
+            for lookup in pending.values():
+                lookup.cancel()
+            return self._greeting(query)
+
+        # DOCUMENT (only for routes that use the uploaded files)
+        if route.query_type not in DOCUMENT_ROUTES:
+            pending.pop("documents").cancel()
+
+        results = self._collect(pending, submitted)
+        return self._compose(
+            query,
+            results,
+            web_backed=web_enabled or include_wikipedia,
+            cacheable=len(results) == len(pending),
+            extra_docs=extra_docs,
+        )
+
+    def _greeting(self, query: str) -> PreparedAnswer:
+        messages = [
+            SystemMessage(content="You are a helpful assistant. Keep replies short."),
+            HumanMessage(content=query),
+        ]
+        return PreparedAnswer(
+            messages=messages,
+            usage={"input_tokens": sum(count_tokens(m.content) for m in messages)},
+        )
+
+    def _compose(
+        self,
+        query: str,
+        results: Dict[str, List],
+        web_backed: bool,
+        cacheable: bool,
+        extra_docs: List = None,
+        query_vector: Optional[Sequence[float]] = None,
+    ) -> PreparedAnswer:
+        # External passages share their own budget before the overall one
+        with tracer.span("context_assembly") as span:
+            assembled = self.assembler.assemble(
+                [
+                    extra_docs or [],
+                    results.get("documents", []),
+                    self.reranker.rerank(
+                        query,
+                        results.get("wikipedia", []) + results.get("web", []),
+                        query_vector,
+                    ),
+                ]
+            )
+            span.set(
+                candidates=assembled.candidates,
+                passages=len(assembled.documents),
+                context_tokens=assembled.context_tokens,
+            )
+        context_docs = assembled.documents
 
         if not context_docs:
-            return {
-                "answer": "I don't have enough information to answer this question.",
-                "sources": [],
-            }
+            return PreparedAnswer(
+                answer="I don't have enough information to answer this question.",
+                web_backed=web_backed,
+                cacheable=cacheable,
+                usage={"input_tokens": 0, "dropped_passages": assembled.dropped},
+            )
 
         context_blocks = []
         sources = []
@@ -73,18 +556,30 @@ class RAGChain:
                      Chunk {doc.metadata.get('chunk_index')}"""
                 )
 
+        # Several passages of one article share a source line
+        sources = list(dict.fromkeys(sources))
         context = "\n\n".join(context_blocks)
-        answer = self.llm.invoke(
-            [
-                SystemMessage(
-                    content=(
-                        "Answer ONLY using the provided context. "
-                        "Cite sources using [Doc X] or [Web X]. "
-                        "If the answer is not present, say you don't know."
-                    )
-                ),
-                HumanMessage(content=f"Context:\n{context}\n\nQuestion:\n{query}"),
-            ]
+        messages = [
+            SystemMessage(
+                content=(
+                    "Answer ONLY using the provided context. "
+                    "Cite sources using [Doc X] or [Web X]. "
+                    "If the answer is not present, say you don't know."
+                )
+            ),
+            HumanMessage(content=f"Context:\n{context}\n\nQuestion:\n{query}"),
+        ]
+        return PreparedAnswer(
+            messages=messages,
+            sources=sources,
+            web_backed=web_backed,
+            cacheable=cacheable,
+            usage={
+                "input_tokens": sum(count_tokens(m.content) for m in messages),
+                "context_tokens": assembled.context_tokens,
+                "passages": len(context_docs),
+                "dropped_passages": assembled.dropped,
+                "merged_chunks": assembled.merged,
+                "trimmed_chars": assembled.trimmed_chars,
+            },
         )
-
-        return {"answer": answer, "sources": sources}
@@ -1,4 +1,13 @@
+from .chunker import Chunk
+from .hashing import chunk_content_hash, file_content_hash
 from .loaders import WikipediaDocumentLoader
-from .processor import DocumentProcessor
+from .processor import DocumentProcessor, document_id
 
-__all__ = ["DocumentProcessor", "WikipediaDocumentLoader"]
+__all__ = [
+    "Chunk",
+    "DocumentProcessor",
+    "WikipediaDocumentLoader",
+    "chunk_content_hash",
+    "document_id",
+    "file_content_hash",
+]
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
 
 class DocumentLoader(ABC):
@@ -10,3 +10,7 @@ class DocumentLoader(ABC):
         Returns list of dicts with keys: content, metadata
         """
         pass
+
+    def lazy_load(self, source: str) -> Iterator[Dict[str, Any]]:
+        """Raw documents one at a time; loaders that can stream override this."""
+        yield from self.load(source)
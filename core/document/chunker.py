@@ -1,32 +1,70 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from config import settings
+from core.embedding import EmbeddingProvider
+
+from .semantic import SemanticSplitter
+
+
+class Chunk:
+    """
+    One piece of a document. All chunks of a document hold a reference to
+    the same metadata dict; `to_dict` gives the per-chunk form the vector
+    store takes, with `chunk_index` added.
+    """
+
+    __slots__ = ("content", "metadata", "index")
+
+    def __init__(self, content: str, metadata: Dict[str, Any], index: int):
+        self.content = content
+        self.metadata = metadata
+        self.index = index
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "content": self.content,
+            "metadata": {**self.metadata, "chunk_index": self.index},
+        }
 
 
 class DocumentChunker:
-    def __init__(self):
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.CHUNK_SIZE,
-            chunk_overlap=settings.CHUNK_OVERLAP,
-            separators=["\n\n", "\n", " ", ""],
-        )
+    """
+    "recursive" cuts fixed-size, overlapping chunks; "semantic" cuts where
+    the topic shifts, using the embedding model (see SemanticSplitter).
+    """
 
-    def chunk(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        chunks: List[Dict[str, Any]] = []
+    def __init__(
+        self,
+        mode: str = "recursive",
+        embedding_provider: Optional[EmbeddingProvider] = None,
+    ):
+        if mode == "recursive":
+            self.splitter = RecursiveCharacterTextSplitter(
+                chunk_size=settings.CHUNK_SIZE,
+                chunk_overlap=settings.CHUNK_OVERLAP,
+                separators=["\n\n", "\n", " ", ""],
+            )
+        elif mode == "semantic":
+            self.splitter = SemanticSplitter(embedding_provider)
+        else:
+            raise ValueError(f"Unsupported chunking mode: {mode}")
+
+    def iter_chunks(self, documents: Iterable[Dict[str, Any]]) -> Iterator[Chunk]:
+        """
+        Chunks produced lazily, one document at a time. Consecutive
+        documents sharing one metadata dict are parts of the same document
+        (a text file read in blocks), so their chunk indices run on.
+        """
+        metadata, index = None, 0
 
         for doc in documents:
-            texts = self.splitter.split_text(doc["content"])
-            for idx, text in enumerate(texts):
-                chunks.append(
-                    {
-                        "content": text,
-                        "metadata": {
-                            **doc["metadata"],
-                            "chunk_index": idx,
-                        },
-                    }
-                )
-
-        return chunks
+            if doc["metadata"] is not metadata:
+                metadata, index = doc["metadata"], 0
+            for text in self.splitter.split_text(doc["content"]):
+                yield Chunk(text, metadata, index)
+                index += 1
+
+    def chunk(self, documents: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [chunk.to_dict() for chunk in self.iter_chunks(documents)]
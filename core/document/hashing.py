@@ -0,0 +1,16 @@
+import hashlib
+
+_READ_SIZE = 1 << 20
+
+
+def file_content_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(_READ_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_content_hash(text: str) -> str:
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
@@ -1,76 +1,193 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
-from langchain_community.document_loaders import (
-    PyPDFLoader,
-    TextLoader,
-    WikipediaLoader,
-)
 from langchain_core.documents import Document
 
+from config import settings
+from core.cache import normalize_query, web_response_cache
+from core.tracing import tracer
+from tools.http import get_http_session, request_timeout
+
 from .base import DocumentLoader
+from .chunker import DocumentChunker
+from .pdf import get_pdf_backend, iter_pdf_pages
+
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+WIKIPEDIA_MAX_QUERY_LENGTH = 300
+WIKIPEDIA_HEADERS = {"User-Agent": "llm-knowledge-system/0.1"}
 
 
 class PDFDocumentLoader(DocumentLoader):
+    """
+    One raw document per page, with its 0-based number under "page".
+    Pages are produced as they are extracted, so a long manual is never
+    held in memory whole; see iter_pdf_pages for the parallel split.
+    """
+
+    def __init__(
+        self,
+        backend: str = settings.PDF_BACKEND,
+        workers: int = settings.PDF_WORKERS,
+    ):
+        self.backend = get_pdf_backend(backend)
+        self.workers = workers
+
     def load(self, source: str) -> List[Dict[str, Any]]:
-        loader = PyPDFLoader(source)
-        docs = loader.load()
+        return list(self.lazy_load(source))
 
-        return [
-            {
-                "content": doc.page_content,
+    def lazy_load(self, source: str) -> Iterator[Dict[str, Any]]:
+        pages = iter_pdf_pages(
+            self.backend,
+            source,
+            self.workers,
+            settings.PDF_PAGES_PER_TASK,
+            settings.PDF_PARALLEL_MIN_PAGES,
+        )
+        for page, text in enumerate(pages):
+            yield {
+                "content": text,
                 "metadata": {
-                    **doc.metadata,
                     "source_type": "pdf",
                     "source": source,
+                    "page": page,
                 },
             }
-            for doc in docs
-        ]
 
 
 class TextDocumentLoader(DocumentLoader):
+    """
+    Reads TEXT_BLOCK_CHARS at a time, each block cut back to its last
+    paragraph or line break; the rest starts the next block. Blocks share
+    one metadata dict, which marks them as parts of a single document for
+    the chunker.
+    """
+
     def load(self, source: str) -> List[Dict[str, Any]]:
-        loader = TextLoader(source, encoding="utf-8")
-        docs = loader.load()
+        return list(self.lazy_load(source))
+
+    def lazy_load(self, source: str) -> Iterator[Dict[str, Any]]:
+        metadata = {"source": source, "source_type": "text"}
+        carry = ""
+
+        with open(source, encoding="utf-8") as f:
+            while True:
+                block = f.read(settings.TEXT_BLOCK_CHARS)
+                carry += block
+                if len(block) < settings.TEXT_BLOCK_CHARS:
+                    break
+
+                half = len(carry) // 2
+                cut = carry.rfind("\n\n", half)
+                if cut < 0:
+                    cut = carry.rfind("\n", half)
+                if cut < 0:
+                    cut = len(carry)
+                yield {"content": carry[:cut], "metadata": metadata}
+                carry = carry[cut:]
+
+        if carry.strip():
+            yield {"content": carry, "metadata": metadata}
+
+
+class WikipediaDocumentLoader(DocumentLoader):
+    """
+    Talks to the MediaWiki API over the shared HTTP session: one search
+    request, then the article extracts fetched concurrently.
+
+    Articles are chunked once when fetched and the passages are cached
+    per (query, load_max_docs), so repeated questions skip the network.
+    """
+
+    def __init__(
+        self,
+        load_max_docs: int = 5,
+        doc_content_chars_max: int = settings.WIKIPEDIA_MAX_CHARS,
+    ):
+        self.load_max_docs = load_max_docs
+        self.doc_content_chars_max = doc_content_chars_max
+        self.session = get_http_session()
+        self.chunker = DocumentChunker()
+        self.executor = ThreadPoolExecutor(
+            max_workers=load_max_docs, thread_name_prefix="wikipedia"
+        )
+        self.cache = web_response_cache()
+
+    def load(self, source: str) -> List[Document]:
+        with tracer.span("wikipedia") as span:
+            passages = self.cache.get_or_fetch(
+                "wikipedia",
+                (normalize_query(source), self.load_max_docs),
+                lambda: self._fetch_passages(source),
+            )
+            span.set(passages=len(passages))
 
         return [
+            Document(page_content=p["content"], metadata=p["metadata"])
+            for p in passages
+        ]
+
+    def _fetch_passages(self, source: str) -> List[Dict[str, Any]]:
+        titles = [
+            hit["title"]
+            for hit in self._request(
+                list="search",
+                srsearch=source[:WIKIPEDIA_MAX_QUERY_LENGTH],
+                srlimit=self.load_max_docs,
+                srprop="",
+            )
+            .get("query", {})
+            .get("search", [])
+        ]
+
+        articles = [
             {
-                "content": doc.page_content,
+                "content": page["extract"][: self.doc_content_chars_max],
                 "metadata": {
-                    **doc.metadata,
-                    "source_type": "text",
+                    "source_type": "wikipedia",
                     "source": source,
+                    "doc_id": f"wikipedia:{page.get('pageid')}",
+                    "title": page.get("title"),
+                    "url": page.get("fullurl"),
                 },
             }
-            for doc in docs
+            for page in self.executor.map(self._fetch_page, titles)
+            if page and page.get("extract")
         ]
 
+        return self.chunker.chunk(articles)
 
-class WikipediaDocumentLoader(DocumentLoader):
-    def load(self, source: str):
-        loader = WikipediaLoader(query=source, load_max_docs=5)
-        docs = loader.load()
-
-        return [
-            Document(
-                page_content=doc.page_content,
-                metadata={
-                    "source_type": "wikipedia",
-                    "source": source,
-                    "title": doc.metadata.get("title"),
-                    "url": doc.metadata.get("source"),
-                },
+    def _fetch_page(self, title: str) -> Optional[Dict[str, Any]]:
+        pages = (
+            self._request(
+                prop="extracts|info",
+                explaintext=1,
+                inprop="url",
+                redirects=1,
+                titles=title,
             )
-            for doc in docs
-        ]
+            .get("query", {})
+            .get("pages", {})
+        )
+        return next(iter(pages.values()), None)
+
+    def _request(self, **params) -> Dict[str, Any]:
+        # A lookup is two round trips: the search, then the articles
+        response = self.session.get(
+            WIKIPEDIA_API_URL,
+            params={"action": "query", "format": "json", **params},
+            headers=WIKIPEDIA_HEADERS,
+            timeout=request_timeout(settings.WIKIPEDIA_TIMEOUT / 2),
+        )
+        response.raise_for_status()
+        return response.json()
 
 
-def detect_loader(path: str) -> DocumentLoader:
+def detect_loader(path: str, pdf_workers: int = settings.PDF_WORKERS) -> DocumentLoader:
     ext = Path(path).suffix.lower()
 
     if ext == ".pdf":
-        return PDFDocumentLoader()
+        return PDFDocumentLoader(workers=pdf_workers)
     if ext in {".txt", ".md"}:
         return TextDocumentLoader()
 
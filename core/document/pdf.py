@@ -0,0 +1,138 @@
+import multiprocessing
+import sys
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Type
+
+
+class PDFBackend(ABC):
+    """
+    Text extraction for one PDF library. Backends hold no open documents,
+    so they can be sent to worker processes, each opening the file itself.
+    """
+
+    @abstractmethod
+    def page_count(self, path: str) -> int:
+        pass
+
+    @abstractmethod
+    def iter_pages(self, path: str, start: int, stop: int) -> Iterator[str]:
+        """Text of pages [start, stop), in reading order."""
+        pass
+
+    def extract(self, path: str, start: int, stop: int) -> List[str]:
+        return list(self.iter_pages(path, start, stop))
+
+
+class PypdfBackend(PDFBackend):
+    """Pure Python; what PyPDFLoader uses."""
+
+    def page_count(self, path: str) -> int:
+        from pypdf import PdfReader
+
+        return len(PdfReader(path).pages)
+
+    def iter_pages(self, path: str, start: int, stop: int) -> Iterator[str]:
+        from pypdf import PdfReader
+
+        reader = PdfReader(path)
+        for index in range(start, stop):
+            yield reader.pages[index].extract_text()
+
+
+class PdfiumBackend(PDFBackend):
+    """PDFium, the C++ engine in Chromium, through pypdfium2."""
+
+    def page_count(self, path: str) -> int:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def iter_pages(self, path: str, start: int, stop: int) -> Iterator[str]:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            for index in range(start, stop):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+
+
+class PyMuPDFBackend(PDFBackend):
+    """MuPDF, through PyMuPDF."""
+
+    def page_count(self, path: str) -> int:
+        import pymupdf
+
+        with pymupdf.open(path) as pdf:
+            return pdf.page_count
+
+    def iter_pages(self, path: str, start: int, stop: int) -> Iterator[str]:
+        import pymupdf
+
+        with pymupdf.open(path) as pdf:
+            for index in range(start, stop):
+                yield pdf[index].get_text("text")
+
+
+PDF_BACKENDS: Dict[str, Type[PDFBackend]] = {
+    "pypdf": PypdfBackend,
+    "pypdfium2": PdfiumBackend,
+    "pymupdf": PyMuPDFBackend,
+}
+
+
+def get_pdf_backend(name: str) -> PDFBackend:
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"Unsupported PDF backend: {name}")
+    return PDF_BACKENDS[name]()
+
+
+def iter_pdf_pages(
+    backend: PDFBackend,
+    path: str,
+    workers: int = 1,
+    pages_per_task: int = 16,
+    parallel_min_pages: int = 64,
+) -> Iterator[str]:
+    """
+    Page texts in order, produced lazily. Long documents are split into
+    page ranges extracted by `workers` processes; at most `workers * 2`
+    ranges are in flight, so memory stays bounded however long the file.
+    """
+    total = backend.page_count(path)
+    if workers <= 1 or total < max(parallel_min_pages, pages_per_task * 2):
+        yield from backend.iter_pages(path, 0, total)
+        return
+
+    ranges = iter(
+        (start, min(start + pages_per_task, total))
+        for start in range(0, total, pages_per_task)
+    )
+    # Not forked: the calling process is threaded (Streamlit, the ingest
+    # pipeline) and a forked child can inherit locks held by other threads
+    context = multiprocessing.get_context(
+        "spawn" if sys.platform == "win32" else "forkserver"
+    )
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        in_flight = [
+            pool.submit(backend.extract, path, *r)
+            for _, r in zip(range(workers * 2), ranges)
+        ]
+        while in_flight:
+            texts = in_flight.pop(0).result()
+            following = next(ranges, None)
+            if following:
+                in_flight.append(pool.submit(backend.extract, path, *following))
+            yield from texts
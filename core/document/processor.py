@@ -1,20 +1,45 @@
-from typing import Any, Dict, List
-from uuid import uuid4
+import hashlib
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import settings
 
 from .chunker import DocumentChunker
+from .hashing import file_content_hash
 from .loaders import detect_loader
 
 
+def document_id(source: str, content_hash: str) -> str:
+    # The same file under the same name always maps to the same doc_id
+    return hashlib.sha256(
+        f"{os.path.basename(source)}\0{content_hash}".encode("utf-8")
+    ).hexdigest()[:32]
+
+
 class DocumentProcessor:
-    def __init__(self):
-        self.chunker = DocumentChunker()
+    def __init__(self, pdf_workers: int = settings.PDF_WORKERS):
+        self.chunker = DocumentChunker(settings.CHUNKING_MODE)
+        self.pdf_workers = pdf_workers
+
+    def load(
+        self, source: str, content_hash: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return list(self.iter_load(source, content_hash))
+
+    def iter_load(
+        self, source: str, content_hash: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        loader = detect_loader(source, self.pdf_workers)
 
-    def process(self, source: str) -> List[Dict[str, Any]]:
-        loader = detect_loader(source)
-        raw_docs = loader.load(source)
+        content_hash = content_hash or file_content_hash(source)
+        doc_id = document_id(source, content_hash)
 
-        doc_id = str(uuid4())
-        for doc in raw_docs:
+        for doc in loader.lazy_load(source):
             doc["metadata"]["doc_id"] = doc_id
+            doc["metadata"]["content_hash"] = content_hash
+            yield doc
 
-        return self.chunker.chunk(raw_docs)
+    def process(
+        self, source: str, content_hash: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return self.chunker.chunk(self.iter_load(source, content_hash))
@@ -0,0 +1,90 @@
+import re
+from typing import List, Optional
+
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from config import settings
+from core.embedding import EmbeddingProvider
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+class SemanticSplitter:
+    """
+    Splits text where consecutive sentences stop being similar. Sentences
+    are embedded in batches; a split falls wherever the cosine distance to
+    the next sentence is above the `breakpoint_percentile` of the text's
+    distances. Pieces shorter than `min_chars` run on into the next one,
+    longer than `max_chars` are cut by the recursive splitter, without
+    overlap.
+
+    The embedding provider defaults to the process-wide one, so sentence
+    vectors share its model and cache.
+    """
+
+    def __init__(
+        self,
+        embedding_provider: Optional[EmbeddingProvider] = None,
+        breakpoint_percentile: float = settings.SEMANTIC_BREAKPOINT_PERCENTILE,
+        min_chars: int = settings.SEMANTIC_MIN_CHUNK_CHARS,
+        max_chars: int = settings.CHUNK_SIZE,
+        batch_size: int = settings.INGEST_BATCH_SIZE,
+    ):
+        self._embedding_provider = embedding_provider
+        self.breakpoint_percentile = breakpoint_percentile
+        self.min_chars = min_chars
+        self.batch_size = batch_size
+        self.fallback = RecursiveCharacterTextSplitter(
+            chunk_size=max_chars,
+            chunk_overlap=0,
+            separators=["\n\n", "\n", " ", ""],
+        )
+
+    @property
+    def embedding_provider(self) -> EmbeddingProvider:
+        if self._embedding_provider is None:
+            from core.registry import shared_embedding_provider
+
+            self._embedding_provider = shared_embedding_provider()
+        return self._embedding_provider
+
+    def split_text(self, text: str) -> List[str]:
+        sentences = [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+        if len(sentences) < 3:
+            return self.fallback.split_text(text)
+
+        breaks = self._breakpoints(sentences)
+        lengths = np.cumsum([len(s) + 1 for s in sentences])
+
+        chunks: List[str] = []
+        start, start_offset = 0, 0
+        for end in [*breaks, len(sentences)]:
+            if (
+                end < len(sentences)
+                and lengths[end - 1] - start_offset < self.min_chars
+            ):
+                continue
+            chunks.extend(self.fallback.split_text(" ".join(sentences[start:end])))
+            start, start_offset = end, lengths[end - 1]
+        return chunks
+
+    def _breakpoints(self, sentences: List[str]) -> List[int]:
+        """Indices of the sentences that begin a new chunk."""
+        vectors = np.vstack(
+            [
+                np.asarray(
+                    self.embedding_provider.embed_documents(
+                        sentences[i : i + self.batch_size]
+                    ),
+                    dtype=np.float32,
+                )
+                for i in range(0, len(sentences), self.batch_size)
+            ]
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+
+        distances = 1 - np.einsum("ij,ij->i", vectors[:-1], vectors[1:])
+        threshold = np.percentile(distances, self.breakpoint_percentile)
+        return (np.flatnonzero(distances > threshold) + 1).tolist()
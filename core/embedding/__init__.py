@@ -1,4 +1,12 @@
 from .base import EmbeddingProvider
+from .batching import BatchingEmbeddingProvider, Histogram
+from .cache import CachedEmbeddingProvider
 from .factory import get_embedding_provider
 
-__all__ = ["get_embedding_provider", "EmbeddingProvider"]
+__all__ = [
+    "get_embedding_provider",
+    "EmbeddingProvider",
+    "BatchingEmbeddingProvider",
+    "CachedEmbeddingProvider",
+    "Histogram",
+]
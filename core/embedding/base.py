@@ -1,8 +1,10 @@
-from abc import ABC, abstractmethod
+from abc import abstractmethod
 from typing import List
 
+from langchain_core.embeddings import Embeddings
 
-class EmbeddingProvider(ABC):
+
+class EmbeddingProvider(Embeddings):
     @abstractmethod
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         pass
@@ -10,3 +12,6 @@ class EmbeddingProvider(ABC):
     @abstractmethod
     def embed_query(self, text: str) -> List[float]:
         pass
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
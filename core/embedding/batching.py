@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from .base import EmbeddingProvider
+
+
+class Histogram:
+    """Counts per power-of-two bucket, which suits queue depths and batch sizes."""
+
+    def __init__(self, max_value: int):
+        self.bounds: List[int] = [1]
+        while self.bounds[-1] < max_value:
+            self.bounds.append(self.bounds[-1] * 2)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: int) -> None:
+        bucket = next(
+            (i for i, bound in enumerate(self.bounds) if value <= bound),
+            len(self.bounds),
+        )
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            labels = [f"<={bound}" for bound in self.bounds]
+            labels.append(f">{self.bounds[-1]}")
+            return {
+                "buckets": dict(zip(labels, self.counts)),
+                "count": self.count,
+                "mean": self.total / self.count if self.count else 0.0,
+                "max": self.max,
+            }
+
+
+class BatchingEmbeddingProvider(EmbeddingProvider):
+    """
+    Coalesces concurrent `embed_query` calls into one `embed_queries` call
+    on the wrapped provider.
+
+    A background thread takes the first waiting query, then keeps
+    collecting for up to `max_wait_ms` or until `max_batch_size` queries
+    are in hand. While a forward pass runs, new queries pile up and go out
+    together in the next one. Document embedding passes straight through.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+    ):
+        self.provider = provider
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self.queue_depth = Histogram(max_batch_size * 4)
+        self.batch_size = Histogram(max_batch_size)
+
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.provider.embed_documents(texts)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        # Already a batch; queueing it would only add latency
+        return self.provider.embed_queries(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        self.queue_depth.observe(self._queue.qsize())
+        return future.result()
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {
+            "queue_depth": self.queue_depth.snapshot(),
+            "batch_size": self.batch_size.snapshot(),
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="query-embedder", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    if timeout > 0:
+                        batch.append(self._queue.get(timeout=timeout))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self.batch_size.observe(len(batch))
+            try:
+                vectors = self.provider.embed_queries([text for text, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
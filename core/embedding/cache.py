@@ -0,0 +1,148 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+
+from core.cache import LRUCache
+from core.tracing import tracer
+
+from .base import EmbeddingProvider
+
+# Keys per lookup; older SQLite builds allow 999 variables per statement
+SQL_BATCH_SIZE = 900
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """Two-tier vector cache: in-memory LRU in front of a sqlite file."""
+
+    def __init__(self, path: str, max_memory_items: int):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.memory = LRUCache(max_memory_items)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+        )
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        pending: List[str] = []
+
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is None:
+                pending.append(key)
+            else:
+                found[key] = vector
+        self.memory_hits += len(found)
+
+        hits = 0
+        for start in range(0, len(pending), SQL_BATCH_SIZE):
+            batch = pending[start : start + SQL_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                self.memory.put(key, vector)
+                found[key] = vector
+            hits += len(rows)
+
+        self.disk_hits += hits
+        self.misses += len(pending) - hits
+
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        for key, vector in items.items():
+            self.memory.put(key, vector)
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, vector.tobytes()) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    def __init__(
+        self, provider: EmbeddingProvider, model_name: str, cache: EmbeddingCache
+    ):
+        self.provider = provider
+        self.model_name = model_name
+        self.cache = cache
+
+    def _key(self, text: str) -> str:
+        payload = f"{self.model_name}\0{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed_many(texts, self.provider.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        with tracer.span("embedding", texts=1) as span:
+            found = self.cache.get_many([key])
+            span.set(cache_hits=len(found))
+
+            if key not in found:
+                vector = np.asarray(self.provider.embed_query(text), dtype=np.float32)
+                self.cache.put_many({key: vector})
+                return vector.tolist()
+
+        return found[key].tolist()
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self._embed_many(texts, self.provider.embed_queries)
+
+    def _embed_many(
+        self, texts: List[str], embed: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        keys = [self._key(t) for t in texts]
+        with tracer.span("embedding", texts=len(texts)) as span:
+            found = self.cache.get_many(list(dict.fromkeys(keys)))
+
+            missing: Dict[str, str] = {}
+            for key, text in zip(keys, texts):
+                if key not in found:
+                    missing.setdefault(key, text)
+            span.set(cache_hits=len(found))
+
+            if missing:
+                vectors = embed(list(missing.values()))
+                computed = {
+                    key: np.asarray(vector, dtype=np.float32)
+                    for key, vector in zip(missing, vectors)
+                }
+                self.cache.put_many(computed)
+                found.update(computed)
+
+        return [found[key].tolist() for key in keys]
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self.cache.stats()
@@ -1,11 +1,40 @@
+import os
+
 from config import settings
 
 from .base import EmbeddingProvider
+from .batching import BatchingEmbeddingProvider
+from .cache import CachedEmbeddingProvider, EmbeddingCache
 from .huggingface import HuggingFaceEmbeddingProvider
+from .onnx_runtime import OnnxEmbeddingProvider
 
 
 def get_embedding_provider() -> EmbeddingProvider:
     if settings.EMBEDDING_PROVIDER == "huggingface":
-        return HuggingFaceEmbeddingProvider()
+        provider = HuggingFaceEmbeddingProvider()
+        model_name = settings.EMBEDDING_MODEL
+    elif settings.EMBEDDING_PROVIDER == "onnx":
+        provider = OnnxEmbeddingProvider()
+        # Quantized vectors differ slightly, so they are cached separately
+        model_name = f"{settings.EMBEDDING_MODEL}:qint8-{settings.ONNX_QUANTIZATION}"
+    else:
+        raise ValueError(
+            f"Unsupported embedding provider: {settings.EMBEDDING_PROVIDER}"
+        )
+
+    # Below the cache, so only misses wait for a batch
+    if settings.QUERY_BATCHING_ENABLED:
+        provider = BatchingEmbeddingProvider(
+            provider,
+            settings.QUERY_BATCH_MAX_SIZE,
+            settings.QUERY_BATCH_MAX_WAIT_MS,
+        )
+
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return provider
 
-    raise ValueError(f"Unsupported embedding provider: {settings.EMBEDDING_PROVIDER}")
+    cache = EmbeddingCache(
+        os.path.join(settings.EMBEDDING_CACHE_DIR, "cache.sqlite"),
+        settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+    )
+    return CachedEmbeddingProvider(provider, model_name, cache)
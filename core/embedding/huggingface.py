@@ -1,3 +1,4 @@
+import threading
 from typing import List
 
 from langchain_huggingface import HuggingFaceEmbeddings
@@ -9,10 +10,27 @@ from .base import EmbeddingProvider
 
 class HuggingFaceEmbeddingProvider(EmbeddingProvider):
     def __init__(self):
-        self.model = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL)
+        # Loaded on first use, so opening the store does not wait on it
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> HuggingFaceEmbeddings:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = HuggingFaceEmbeddings(
+                        model_name=settings.EMBEDDING_MODEL
+                    )
+        return self._model
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         return self.model.embed_documents(texts)
 
     def embed_query(self, text: str) -> List[float]:
         return self.model.embed_query(text)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        # No query instruction is configured, so queries encode exactly like
+        # documents and a whole batch goes through in one forward pass
+        return self.model.embed_documents(texts)
@@ -0,0 +1,93 @@
+import os
+import threading
+from typing import TYPE_CHECKING, List
+
+from config import settings
+
+from .base import EmbeddingProvider
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+ONNX_QUANTIZATIONS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+
+def _session_options():
+    # onnxruntime only comes with the optional sentence-transformers[onnx]
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    # One inference at a time; all threads go to the matmuls inside it
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.inter_op_num_threads = 1
+    if settings.ONNX_THREADS:
+        options.intra_op_num_threads = settings.ONNX_THREADS
+    return options
+
+
+class OnnxEmbeddingProvider(EmbeddingProvider):
+    """
+    EMBEDDING_MODEL run through ONNX Runtime with int8 dynamic quantization.
+    The quantized graph is exported once into ONNX_MODEL_DIR and reused.
+    """
+
+    def __init__(self):
+        if settings.ONNX_QUANTIZATION not in ONNX_QUANTIZATIONS:
+            raise ValueError(
+                f"Unsupported ONNX quantization: {settings.ONNX_QUANTIZATION}"
+            )
+        self.file_name = f"onnx/model_qint8_{settings.ONNX_QUANTIZATION}.onnx"
+        self.path = os.path.join(
+            settings.ONNX_MODEL_DIR, settings.EMBEDDING_MODEL.replace("/", "--")
+        )
+
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+    def _load(self) -> "SentenceTransformer":
+        # Imported here: core.embedding is imported by every worker process,
+        # which should not pay for loading torch and transformers
+        from sentence_transformers import SentenceTransformer
+
+        if not os.path.exists(os.path.join(self.path, self.file_name)):
+            self._export()
+
+        return SentenceTransformer(
+            self.path,
+            backend="onnx",
+            model_kwargs={
+                "file_name": self.file_name,
+                "provider": "CPUExecutionProvider",
+                "session_options": _session_options(),
+            },
+        )
+
+    def _export(self) -> None:
+        from sentence_transformers import (
+            SentenceTransformer,
+            export_dynamic_quantized_onnx_model,
+        )
+
+        model = SentenceTransformer(settings.EMBEDDING_MODEL, backend="onnx")
+        model.save_pretrained(self.path)
+        export_dynamic_quantized_onnx_model(
+            model, settings.ONNX_QUANTIZATION, self.path
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.model.encode(texts, convert_to_numpy=True).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
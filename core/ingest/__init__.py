@@ -0,0 +1,3 @@
+from .pipeline import IngestionPipeline, IngestReport
+
+__all__ = ["IngestionPipeline", "IngestReport"]
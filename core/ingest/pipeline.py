@@ -0,0 +1,365 @@
+import contextlib
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from config import settings
+from core.document import Chunk, DocumentProcessor, document_id, file_content_hash
+
+_processors: Dict[int, DocumentProcessor] = {}
+
+
+def _processor(pdf_workers: int) -> DocumentProcessor:
+    # One per process, and per PDF parallelism, reused across files
+    if pdf_workers not in _processors:
+        _processors[pdf_workers] = DocumentProcessor(pdf_workers)
+    return _processors[pdf_workers]
+
+
+class _FileChunks:
+    """Chunks of one file, produced lazily; `pages` counts documents read."""
+
+    def __init__(self, path: str, content_hash: str, pdf_workers: int):
+        self.processor = _processor(pdf_workers)
+        self.path = path
+        self.content_hash = content_hash
+        self.pages = 0
+
+    def __iter__(self) -> Iterator[Chunk]:
+        return self.processor.chunker.iter_chunks(self._documents())
+
+    def _documents(self) -> Iterator[Dict[str, Any]]:
+        # Blocks of one long text file share their metadata and count once
+        metadata = None
+        for doc in self.processor.iter_load(self.path, self.content_hash):
+            if doc["metadata"] is not metadata:
+                metadata = doc["metadata"]
+                self.pages += 1
+            yield doc
+
+
+def _parse_file(
+    path: str, content_hash: str, pdf_workers: int
+) -> Tuple[int, List[Chunk]]:
+    # Runs inside pool workers
+    parsed = _FileChunks(path, content_hash, pdf_workers)
+    chunks = list(parsed)
+    return parsed.pages, chunks
+
+
+@dataclass
+class _Version:
+    """A new version of a file, staged until all of its chunks are stored."""
+
+    doc_id: str
+    pending: int = 0
+    parsed: bool = False
+
+
+@dataclass
+class IngestReport:
+    total_files: int = 0
+    files_done: int = 0
+    pages: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    duplicate_chunks: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)
+    ingested: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    replaced: List[str] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+    finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def embeddings_per_sec(self) -> float:
+        return self.embedded / self.elapsed if self.elapsed else 0.0
+
+
+class IngestionPipeline:
+    """
+    Parses and chunks files in a process pool while the calling thread
+    embeds finished chunks in fixed-size batches and appends them to the
+    vector store. At most `workers * 2` files are in flight, which bounds
+    memory regardless of how many files are submitted.
+
+    A lone file, one of INGEST_STREAM_MIN_BYTES or more, or any file under
+    semantic chunking is read and chunked lazily in the calling thread
+    instead, each batch embedded as soon as it fills, so memory is bounded
+    by the batch size rather than by the size of the file.
+
+    Files whose content is already indexed under the same title are skipped
+    before parsing. A changed file is stored alongside its previous version,
+    which is only removed once every chunk of the new one is in; a file
+    that fails part way is rolled back and the previous version stays.
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        workers: int = settings.INGEST_WORKERS,
+        batch_size: int = settings.INGEST_BATCH_SIZE,
+    ):
+        self.vector_store = vector_store
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def ingest(
+        self,
+        files: Sequence[Tuple[str, str]],
+        on_progress: Optional[Callable[[IngestReport], None]] = None,
+    ) -> IngestReport:
+        """Ingest (path, title) pairs; a failing file never aborts the batch."""
+        report = IngestReport(total_files=len(files))
+        pending = iter(files)
+        in_flight: Dict[Future, Tuple[str, str, str]] = {}
+        streamed: List[Tuple[str, str, str]] = []
+        batch: List[Chunk] = []
+        staged: Dict[str, _Version] = {}
+
+        # Files already run in parallel processes, or pages of one file do.
+        # Semantic chunking needs the embedding model, which stays in this
+        # process rather than being loaded once per worker.
+        parallel_files = (
+            len(files) > 1
+            and self.workers > 1
+            and settings.CHUNKING_MODE == "recursive"
+        )
+        pdf_workers = 1 if parallel_files else settings.PDF_WORKERS
+
+        def submit(pool, count: int) -> None:
+            self._submit(pool, pending, in_flight, streamed, count, report, pdf_workers)
+
+        with self._executor(parallel_files) as pool:
+            submit(pool, self.workers * 2)
+
+            while in_flight or streamed:
+                if streamed:
+                    path, title, content_hash = streamed.pop(0)
+                    self._stream(
+                        path,
+                        title,
+                        content_hash,
+                        pdf_workers,
+                        batch,
+                        staged,
+                        report,
+                        on_progress,
+                    )
+                    submit(pool, 1)
+                    continue
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    path, title, content_hash = in_flight.pop(future)
+                    report.files_done += 1
+
+                    try:
+                        pages, chunks = future.result()
+                    except Exception as exc:
+                        report.failures[title] = str(exc)
+                    else:
+                        for chunk in chunks:
+                            chunk.metadata["title"] = title
+                        report.pages += pages
+                        report.chunks += len(chunks)
+                        report.ingested.append(title)
+                        staged[title] = _Version(
+                            document_id(path, content_hash), len(chunks), True
+                        )
+                        batch.extend(chunks)
+                        self._finish(title, staged, report)
+
+                    submit(pool, 1)
+
+                self._embed_batches(batch, staged, report)
+
+                if on_progress:
+                    on_progress(report)
+
+        self._embed_batches(batch, staged, report, flush=True)
+        if report.ingested:
+            self.vector_store.persist()
+
+        report.finished = time.monotonic()
+        if on_progress:
+            on_progress(report)
+        return report
+
+    def _executor(self, parallel_files: bool) -> ContextManager:
+        if parallel_files:
+            # Forking this threaded process could copy a lock held by another
+            # thread into the workers; forkserver starts them clean
+            context = multiprocessing.get_context(
+                "spawn" if sys.platform == "win32" else "forkserver"
+            )
+            return ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return contextlib.nullcontext()
+
+    def _submit(
+        self,
+        pool: Optional[ProcessPoolExecutor],
+        pending: Iterator[Tuple[str, str]],
+        in_flight: Dict[Future, Tuple[str, str, str]],
+        streamed: List[Tuple[str, str, str]],
+        count: int,
+        report: IngestReport,
+        pdf_workers: int,
+    ) -> None:
+        while count > 0:
+            item = next(pending, None)
+            if item is None:
+                return
+
+            path, title = item
+            try:
+                content_hash = file_content_hash(path)
+                size = os.path.getsize(path)
+            except OSError as exc:
+                report.files_done += 1
+                report.failures[title] = str(exc)
+                continue
+
+            if self.vector_store.is_indexed(title, content_hash):
+                report.files_done += 1
+                report.skipped.append(title)
+                continue
+
+            if pool is None or size >= settings.INGEST_STREAM_MIN_BYTES:
+                streamed.append((path, title, content_hash))
+            else:
+                future = pool.submit(_parse_file, path, content_hash, pdf_workers)
+                in_flight[future] = (path, title, content_hash)
+            count -= 1
+
+    def _stream(
+        self,
+        path: str,
+        title: str,
+        content_hash: str,
+        pdf_workers: int,
+        batch: List[Chunk],
+        staged: Dict[str, _Version],
+        report: IngestReport,
+        on_progress: Optional[Callable[[IngestReport], None]],
+    ) -> None:
+        report.ingested.append(title)
+        version = staged[title] = _Version(document_id(path, content_hash))
+        parsed = _FileChunks(path, content_hash, pdf_workers)
+
+        try:
+            for chunk in parsed:
+                chunk.metadata["title"] = title
+                batch.append(chunk)
+                version.pending += 1
+                report.chunks += 1
+                if len(batch) >= self.batch_size:
+                    self._embed_batches(batch, staged, report)
+                    if on_progress:
+                        on_progress(report)
+                    if title not in staged:
+                        # Failed to embed and already rolled back
+                        break
+        except Exception as exc:
+            self._fail(title, str(exc), batch, staged, report)
+        else:
+            version.parsed = True
+            self._finish(title, staged, report)
+
+        report.pages += parsed.pages
+        report.files_done += 1
+
+    def _finish(
+        self, title: str, staged: Dict[str, _Version], report: IngestReport
+    ) -> None:
+        # Swap in the new version once all of it is stored
+        version = staged.get(title)
+        if version is None or not version.parsed or version.pending:
+            return
+        del staged[title]
+        if self.vector_store.replace_document(title, version.doc_id):
+            report.replaced.append(title)
+
+    def _fail(
+        self,
+        title: str,
+        error: str,
+        batch: List[Chunk],
+        staged: Dict[str, _Version],
+        report: IngestReport,
+    ) -> None:
+        # Whatever of the new version was stored goes; the previous stays
+        report.failures.setdefault(title, error)
+        if title in report.ingested:
+            report.ingested.remove(title)
+        batch[:] = [chunk for chunk in batch if chunk.metadata["title"] != title]
+        version = staged.pop(title, None)
+        if version is not None:
+            self.vector_store.remove_version(version.doc_id)
+
+    def _embed_batches(
+        self,
+        batch: List[Chunk],
+        staged: Dict[str, _Version],
+        report: IngestReport,
+        flush: bool = False,
+    ) -> None:
+        # Full batches only, unless flushing what is left at the end
+        while len(batch) >= self.batch_size or (flush and batch):
+            chunks = batch[: self.batch_size]
+            del batch[: self.batch_size]
+            self._embed(chunks, batch, staged, report)
+
+    def _embed(
+        self,
+        chunks: List[Chunk],
+        batch: List[Chunk],
+        staged: Dict[str, _Version],
+        report: IngestReport,
+    ) -> None:
+        # `chunks` came off the front of `batch`; a failure also drops the
+        # rest of each affected file from it
+        titles = Counter(chunk.metadata["title"] for chunk in chunks)
+        try:
+            stored = self.vector_store.add_documents(
+                [chunk.to_dict() for chunk in chunks], persist=False
+            )
+        except Exception as exc:
+            for title in titles:
+                self._fail(title, str(exc), batch, staged, report)
+            return
+
+        report.embedded += stored
+        report.duplicate_chunks += len(chunks) - stored
+
+        for title, count in titles.items():
+            staged[title].pending -= count
+            self._finish(title, staged, report)
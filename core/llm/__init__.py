@@ -1,4 +1,6 @@
 from .base import LLMProvider
 from .factory import get_llm_provider
+from .retry import invoke_with_backoff
+from .tokens import count_tokens
 
-__all__ = ["get_llm_provider", "LLMProvider"]
+__all__ = ["count_tokens", "get_llm_provider", "invoke_with_backoff", "LLMProvider"]
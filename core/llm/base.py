@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 
 from langchain_core.messages import BaseMessage
 
@@ -8,3 +8,7 @@ class LLMProvider(ABC):
     @abstractmethod
     def invoke(self, messages: List[BaseMessage]) -> str:
         pass
+
+    def stream(self, messages: List[BaseMessage]) -> Iterator[str]:
+        # Providers without native streaming emit the whole answer at once
+        yield self.invoke(messages)
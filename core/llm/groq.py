@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List
 
 from langchain_core.messages import BaseMessage
 from langchain_groq import ChatGroq
@@ -11,7 +11,7 @@ from .base import LLMProvider
 class GroqLLMProvider(LLMProvider):
     def __init__(self):
         self.client = ChatGroq(
-            api_key=settings.GROQ_API_KEY,
+            api_key=settings.require("GROQ_API_KEY"),
             model=settings.LLM_MODEL,
             max_tokens=settings.MAX_TOKENS,
         )
@@ -19,3 +19,8 @@ class GroqLLMProvider(LLMProvider):
     def invoke(self, messages: List[BaseMessage]) -> str:
         response = self.client.invoke(messages)
         return response.content
+
+    def stream(self, messages: List[BaseMessage]) -> Iterator[str]:
+        for chunk in self.client.stream(messages):
+            if chunk.content:
+                yield chunk.content
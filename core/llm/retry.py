@@ -0,0 +1,56 @@
+import logging
+import random
+import time
+from typing import List, Optional
+
+from langchain_core.messages import BaseMessage
+
+from .base import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def _status(exc: Exception) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def invoke_with_backoff(
+    llm: LLMProvider,
+    messages: List[BaseMessage],
+    max_retries: int,
+    base_delay: float,
+    max_delay: float = 60.0,
+) -> str:
+    """
+    Invoke the LLM, retrying rate-limited and transient server errors with
+    jittered exponential backoff; a server-sent Retry-After wins when present.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return llm.invoke(messages)
+        except Exception as exc:
+            if attempt == max_retries or _status(exc) not in RETRYABLE_STATUS:
+                raise
+
+            delay = _retry_after(exc)
+            if delay is None:
+                delay = random.uniform(0, min(max_delay, base_delay * 2**attempt))
+            logger.warning(
+                "LLM call failed with status %s, retrying in %.1fs",
+                _status(exc),
+                delay,
+            )
+            time.sleep(delay)
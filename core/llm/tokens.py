@@ -0,0 +1,37 @@
+import functools
+import logging
+import re
+from typing import Callable, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Only used when the tiktoken encoding cannot be loaded: words, numbers and
+# single punctuation marks, which undercounts subword-split text
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+@functools.lru_cache(maxsize=1)
+def _encoder() -> Optional[Callable[[str], List[int]]]:
+    # The encoding file is downloaded once into tiktoken's cache
+    # (TIKTOKEN_CACHE_DIR); offline without it, counts fall back to the regex
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(settings.TOKENIZER_ENCODING).encode_ordinary
+    except Exception as exc:
+        logger.warning(
+            "Tokenizer %s unavailable (%s), approximating token counts",
+            settings.TOKENIZER_ENCODING,
+            exc,
+        )
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in `text` under TOKENIZER_ENCODING."""
+    encode = _encoder()
+    if encode is None:
+        return len(TOKEN_PATTERN.findall(text))
+    return len(encode(text))
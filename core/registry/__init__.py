@@ -0,0 +1,17 @@
+from .registry import (
+    ResourceRegistry,
+    registry,
+    shared_embedding_provider,
+    shared_llm_provider,
+    shared_rag_chain,
+    shared_vector_store,
+)
+
+__all__ = [
+    "ResourceRegistry",
+    "registry",
+    "shared_embedding_provider",
+    "shared_llm_provider",
+    "shared_rag_chain",
+    "shared_vector_store",
+]
@@ -0,0 +1,67 @@
+import threading
+from typing import Any, Callable, Dict, TypeVar
+
+from core.chain import RAGChain
+from core.embedding import EmbeddingProvider, get_embedding_provider
+from core.llm import LLMProvider, get_llm_provider
+from core.retriever import RetrieverService
+from core.vectorstore import VectorStoreService
+
+T = TypeVar("T")
+
+
+class ResourceRegistry:
+    """
+    Process-wide instances, each built once on first use. Every name has
+    its own lock, so a slow load (the embedding model, a large index) only
+    blocks callers waiting for that same resource.
+    """
+
+    def __init__(self):
+        self._resources: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, factory: Callable[[], T]) -> T:
+        if name in self._resources:
+            return self._resources[name]
+
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+
+        with lock:
+            if name not in self._resources:
+                self._resources[name] = factory()
+            return self._resources[name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._resources.clear()
+
+
+registry = ResourceRegistry()
+
+
+def shared_embedding_provider() -> EmbeddingProvider:
+    return registry.get("embedding_provider", get_embedding_provider)
+
+
+def shared_llm_provider() -> LLMProvider:
+    return registry.get("llm_provider", get_llm_provider)
+
+
+def shared_vector_store() -> VectorStoreService:
+    return registry.get(
+        "vector_store", lambda: VectorStoreService(shared_embedding_provider())
+    )
+
+
+def shared_rag_chain() -> RAGChain:
+    # Sessions share the chain too: its caches and source pool are keyed
+    # by query and store version, never by session
+    return registry.get(
+        "rag_chain",
+        lambda: RAGChain(
+            RetrieverService(shared_vector_store()), shared_llm_provider()
+        ),
+    )
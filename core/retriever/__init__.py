@@ -1,3 +1,4 @@
+from .reranker import PassageReranker
 from .retriever import RetrieverService
 
-__all__ = ["RetrieverService"]
+__all__ = ["PassageReranker", "RetrieverService"]
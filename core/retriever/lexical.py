@@ -0,0 +1,212 @@
+import math
+import os
+import pickle
+import re
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+LEXICAL_FILE = "lexical.pkl"
+LEXICAL_SCHEMA_VERSION = 1
+
+# Keeps identifiers such as "ERR-1042", "v2.3.1" or "snake_case" whole
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index with array-backed postings.
+
+    Documents get dense internal numbers; each term maps to two parallel
+    uint32 arrays (document numbers, term frequencies). Removal only
+    clears the document's `alive` flag, and postings are compacted once
+    the dead fraction crosses `compact_ratio`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fallback: Callable[[], Iterable[Tuple[str, str]]],
+        compact_ratio: float = 0.3,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.path = os.path.join(directory, LEXICAL_FILE)
+        self.fallback = fallback
+        self.compact_ratio = compact_ratio
+        self.k1 = k1
+        self.b = b
+
+        self._loaded = False
+        self._reset()
+
+    def add(self, ids: List[str], texts: List[str]) -> None:
+        self.load()
+
+        for chunk_id, text in zip(ids, texts):
+            if chunk_id in self.numbers:
+                continue
+
+            number = len(self.ids)
+            self.ids.append(chunk_id)
+            self.numbers[chunk_id] = number
+
+            counts: Dict[str, int] = {}
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + 1
+
+            for term, tf in counts.items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = (array("I"), array("I"))
+                postings[0].append(number)
+                postings[1].append(tf)
+
+            length = sum(counts.values())
+            self.lengths.append(length)
+            self.alive.append(1)
+            self.total_length += length
+            self.live_count += 1
+
+    def remove(self, ids: Iterable[str]) -> None:
+        self.load()
+
+        for chunk_id in ids:
+            number = self.numbers.pop(chunk_id, None)
+            if number is None:
+                continue
+            self.alive[number] = 0
+            self.total_length -= self.lengths[number]
+            self.live_count -= 1
+
+        if len(self.ids) and 1 - self.live_count / len(self.ids) > self.compact_ratio:
+            self._compact()
+
+    def search(self, query: str, k: int) -> List[str]:
+        self.load()
+        if not self.live_count:
+            return []
+
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32)
+        avg_length = self.total_length / self.live_count
+        norm = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+
+            docs = np.frombuffer(postings[0], dtype=np.uint32)
+            tfs = np.frombuffer(postings[1], dtype=np.uint32).astype(np.float32)
+            df = len(docs)
+            idf = math.log(1 + (self.live_count - df + 0.5) / (df + 0.5))
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+
+        scores *= np.frombuffer(self.alive, dtype=np.uint8)
+        candidates = np.flatnonzero(scores)
+        if not len(candidates):
+            return []
+
+        if len(candidates) > k:
+            top = np.argpartition(scores[candidates], -k)[-k:]
+            candidates = candidates[top]
+        ranked = candidates[np.argsort(scores[candidates])[::-1]]
+
+        return [self.ids[n] for n in ranked]
+
+    def save(self) -> None:
+        self.load()
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                {
+                    "schema_version": LEXICAL_SCHEMA_VERSION,
+                    "ids": self.ids,
+                    "lengths": self.lengths,
+                    "alive": self.alive,
+                    "postings": self.postings,
+                },
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, self.path)
+
+    def reset(self) -> None:
+        self._reset()
+        self._loaded = True
+
+    def _reset(self) -> None:
+        self.ids: List[str] = []
+        self.numbers: Dict[str, int] = {}
+        self.lengths = array("I")
+        self.alive = bytearray()
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.total_length = 0
+        self.live_count = 0
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+
+        data = self._read()
+        if data is None:
+            pairs = list(self.fallback())
+            if pairs:
+                self.add([p[0] for p in pairs], [p[1] for p in pairs])
+            return
+
+        self.ids = data["ids"]
+        self.lengths = data["lengths"]
+        self.alive = data["alive"]
+        self.postings = data["postings"]
+        for number, chunk_id in enumerate(self.ids):
+            if self.alive[number]:
+                self.numbers[chunk_id] = number
+                self.total_length += self.lengths[number]
+        self.live_count = len(self.numbers)
+
+    def _read(self) -> Optional[dict]:
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, "rb") as f:
+            data = pickle.load(f)
+
+        if data.get("schema_version") != LEXICAL_SCHEMA_VERSION:
+            return None
+        return data
+
+    def _compact(self) -> None:
+        remap = array("I", [0]) * len(self.ids)
+        ids: List[str] = []
+        lengths = array("I")
+
+        for number, chunk_id in enumerate(self.ids):
+            if self.alive[number]:
+                remap[number] = len(ids)
+                ids.append(chunk_id)
+                lengths.append(self.lengths[number])
+
+        postings: Dict[str, Tuple[array, array]] = {}
+        for term, (docs, tfs) in self.postings.items():
+            kept_docs, kept_tfs = array("I"), array("I")
+            for number, tf in zip(docs, tfs):
+                if self.alive[number]:
+                    kept_docs.append(remap[number])
+                    kept_tfs.append(tf)
+            if kept_docs:
+                postings[term] = (kept_docs, kept_tfs)
+
+        self.ids = ids
+        self.numbers = {chunk_id: n for n, chunk_id in enumerate(ids)}
+        self.lengths = lengths
+        self.alive = bytearray(b"\x01") * len(ids)
+        self.postings = postings
@@ -0,0 +1,61 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+
+from core.llm import count_tokens
+
+
+class PassageReranker:
+    """
+    Scores external passages against the query by cosine similarity and
+    keeps the best ones that fit in `max_tokens`. Passage embeddings go
+    through the shared provider, so cached passages are never re-embedded.
+    """
+
+    def __init__(self, embedding_provider, max_tokens: int, max_passages: int):
+        self.embedding_provider = embedding_provider
+        self.max_tokens = max_tokens
+        self.max_passages = max_passages
+
+    def rerank(
+        self,
+        query: str,
+        documents: List[Document],
+        query_vector: Optional[Sequence[float]] = None,
+    ) -> List[Document]:
+        if not documents:
+            return []
+
+        if query_vector is None:
+            query_vector = self.embedding_provider.embed_query(query)
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        vectors = np.asarray(
+            self.embedding_provider.embed_documents(
+                [doc.page_content for doc in documents]
+            ),
+            dtype=np.float32,
+        )
+
+        norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query_vector) or 1.0)
+        scores = vectors @ query_vector / np.where(norms == 0, 1.0, norms)
+
+        selected: List[Document] = []
+        used = 0
+        for index in np.argsort(scores)[::-1]:
+            doc = documents[index]
+            tokens = count_tokens(doc.page_content)
+            if used + tokens > self.max_tokens:
+                continue
+            # A copy: the passages themselves are shared through the cache
+            selected.append(
+                Document(
+                    page_content=doc.page_content,
+                    metadata={**doc.metadata, "score": float(scores[index])},
+                )
+            )
+            used += tokens
+            if len(selected) == self.max_passages:
+                break
+
+        return selected
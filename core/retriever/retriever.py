@@ -1,12 +1,90 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 
 from config import settings
+from core.tracing import tracer
 
 
 class RetrieverService:
     def __init__(self, vector_store_service):
         self.vector_store_service = vector_store_service
+        self._retriever: BaseRetriever | None = None
+        self._retriever_key = None
 
     def build_retriever(self) -> BaseRetriever:
+        # Reused until the underlying store changes
+        store = self.vector_store_service.get_store()
+        key = (id(store), self.vector_store_service.version)
+
+        if self._retriever is None or self._retriever_key != key:
+            self._retriever = store.as_retriever(search_kwargs={"k": settings.TOP_K})
+            self._retriever_key = key
+
+        return self._retriever
+
+    def retrieve(self, query: str) -> List[Document]:
+        with tracer.span("retrieval"), self.vector_store_service.reading():
+            if settings.RETRIEVAL_MODE != "hybrid":
+                with tracer.span("vector_search", k=settings.TOP_K):
+                    return self.build_retriever().invoke(query)
+
+            store = self.vector_store_service.get_store()
+            fetch_k = max(settings.HYBRID_FETCH_K, settings.TOP_K)
+
+            with tracer.span("vector_search", k=fetch_k):
+                vector_ids = [
+                    doc.id for doc in store.similarity_search(query, k=fetch_k)
+                ]
+            return self._fuse(store, query, vector_ids, fetch_k)
+
+    def retrieve_batch(
+        self, queries: Sequence[str], vectors: np.ndarray
+    ) -> List[List[Document]]:
+        """Retrieve for many queries with one FAISS search over their vectors."""
+        with tracer.span("retrieval", queries=len(queries)):
+            with self.vector_store_service.reading():
+                return self._retrieve_batch(queries, vectors)
+
+    def _retrieve_batch(
+        self, queries: Sequence[str], vectors: np.ndarray
+    ) -> List[List[Document]]:
         store = self.vector_store_service.get_store()
-        return store.as_retriever(search_kwargs={"k": settings.TOP_K})
+        hybrid = settings.RETRIEVAL_MODE == "hybrid"
+        fetch_k = (
+            max(settings.HYBRID_FETCH_K, settings.TOP_K) if hybrid else settings.TOP_K
+        )
+
+        with tracer.span("vector_search", k=fetch_k, queries=len(queries)):
+            _, positions = store.index.search(
+                np.asarray(vectors, dtype=np.float32), fetch_k
+            )
+
+        results = []
+        for query, row in zip(queries, positions):
+            vector_ids = [store.index_to_docstore_id[p] for p in row if p != -1]
+            if hybrid:
+                results.append(self._fuse(store, query, vector_ids, fetch_k))
+            else:
+                results.append([store.docstore.search(i) for i in vector_ids])
+        return results
+
+    def _fuse(
+        self, store, query: str, vector_ids: List[str], fetch_k: int
+    ) -> List[Document]:
+        with tracer.span("lexical_search", k=fetch_k):
+            lexical_ids = self.vector_store_service.lexical.search(query, fetch_k)
+
+        # Reciprocal-rank fusion: only ranks matter, so BM25 and cosine
+        # scores never need to be put on a common scale.
+        fused: Dict[str, float] = {}
+        for ranking in (vector_ids, lexical_ids):
+            for rank, chunk_id in enumerate(ranking, 1):
+                fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (
+                    settings.RRF_K + rank
+                )
+
+        top_ids = sorted(fused, key=fused.get, reverse=True)[: settings.TOP_K]
+        return [store.docstore.search(chunk_id) for chunk_id in top_ids]
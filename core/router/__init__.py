@@ -1,3 +1,4 @@
-from .query_router import QueryRoute, QueryRouter, QueryType
+from .query_router import QueryRouter
+from .types import QueryRoute, QueryType
 
 __all__ = ["QueryRouter", "QueryType", "QueryRoute"]
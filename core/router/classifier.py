@@ -0,0 +1,104 @@
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.embedding import EmbeddingProvider
+
+from .types import QueryType
+
+GREETING_PATTERN = re.compile(
+    r"^\s*(hi+|hello+|hey+|hiya|yo|howdy|greetings|good\s+(morning|afternoon|evening)"
+    r"|thanks?(\s+you)?|thank\s+you(\s+so\s+much)?|thx|ty|bye|goodbye|see\s+you"
+    r"|how\s+are\s+you(\s+doing)?|what'?s\s+up|sup|ok(ay)?|cool|great)"
+    r"(\s+(there|all|everyone|bot|assistant|again))?\s*[!.?]*\s*$",
+    re.IGNORECASE,
+)
+
+ROUTE_EXAMPLES: Dict[QueryType, List[str]] = {
+    QueryType.GREETING: [
+        "hi there, how is it going",
+        "hello, nice to meet you",
+        "thanks a lot for the help",
+        "good morning assistant",
+    ],
+    QueryType.DOCUMENT: [
+        "what does the uploaded document say about this topic",
+        "summarize the report I uploaded",
+        "according to the file, what are the requirements",
+        "find the section in my notes that explains the setup",
+        "what is the definition given in the paper",
+        "list the key points from chapter two of the manual",
+    ],
+    QueryType.WEB: [
+        "what is the latest news today",
+        "what is the weather forecast for tomorrow",
+        "current stock price of the company",
+        "who won the match last night",
+        "what happened in the election this week",
+        "recent release announcements from this month",
+    ],
+    QueryType.HYBRID: [
+        "compare what my document says with the latest information online",
+        "is the information in the uploaded report still up to date",
+        "check my notes against current news",
+        "how does the paper's claim compare to recent developments",
+    ],
+}
+
+
+class RuleClassifier:
+    def classify(self, query: str) -> Optional[QueryType]:
+        if GREETING_PATTERN.match(query):
+            return QueryType.GREETING
+        return None
+
+
+class CentroidClassifier:
+    """Nearest-centroid intent classifier over the shared embedding model."""
+
+    def __init__(
+        self,
+        embedding_provider: EmbeddingProvider,
+        examples: Dict[QueryType, List[str]] = ROUTE_EXAMPLES,
+    ):
+        self.embedding_provider = embedding_provider
+        self.examples = examples
+        self._labels: List[QueryType] = []
+        self._centroids: Optional[np.ndarray] = None
+
+    def classify(
+        self, query: str, vector: Optional[Sequence[float]] = None
+    ) -> Tuple[QueryType, float]:
+        """Return the closest label and its cosine margin over the runner-up."""
+        centroids = self._get_centroids()
+
+        if vector is None:
+            vector = self.embedding_provider.embed_query(query)
+        vector = np.array(vector, dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+
+        scores = centroids @ vector
+        best, second = np.argsort(scores)[::-1][:2]
+        return self._labels[best], float(scores[best] - scores[second])
+
+    def _get_centroids(self) -> np.ndarray:
+        if self._centroids is not None:
+            return self._centroids
+
+        texts = [t for examples in self.examples.values() for t in examples]
+        vectors = np.asarray(
+            self.embedding_provider.embed_documents(texts), dtype=np.float32
+        )
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        labels, centroids, offset = [], [], 0
+        for label, examples in self.examples.items():
+            centroid = vectors[offset : offset + len(examples)].mean(axis=0)
+            centroids.append(centroid / np.linalg.norm(centroid))
+            labels.append(label)
+            offset += len(examples)
+
+        self._labels = labels
+        self._centroids = np.stack(centroids)
+        return self._centroids
@@ -1,28 +1,26 @@
-from dataclasses import dataclass
-from enum import Enum
+import logging
+from collections import Counter
+from typing import Dict, Optional, Sequence, Tuple
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from core.llm import get_llm_provider
+from config import settings
+from core.embedding import EmbeddingProvider
+from core.llm import LLMProvider, get_llm_provider, invoke_with_backoff
 
+from .classifier import CentroidClassifier, RuleClassifier
+from .types import QueryRoute, QueryType
 
-class QueryType(str, Enum):
-    GREETING = "GREETING"
-    DOCUMENT = "DOCUMENT"
-    WEB = "WEB"
-    HYBRID = "HYBRID"
-    REFUSE = "REFUSE"
-
-
-@dataclass(frozen=True)
-class QueryRoute:
-    query_type: QueryType
-    allow_web: bool
+logger = logging.getLogger(__name__)
 
 
 class QueryRouter:
-    def __init__(self):
-        self.llm = get_llm_provider()
+    def __init__(
+        self,
+        embedding_provider: Optional[EmbeddingProvider] = None,
+        llm: Optional[LLMProvider] = None,
+    ):
+        self.llm = llm or get_llm_provider()
         self.system_prompt = (
             "You are an intent classifier for a search system.\n"
             "Classify the user query into exactly ONE label:\n"
@@ -31,33 +29,71 @@ class QueryRouter:
             "No Extra Text"
         )
 
-    def route(self, query: str, web_enabled: bool) -> QueryRoute:
-        raw = (
-            self.llm.invoke(
-                [
-                    SystemMessage(content=self.system_prompt),
-                    HumanMessage(content=query),
-                ]
-            )
-            .strip()
-            .upper()
+        # Local tiers answer first; the LLM is only asked when they are unsure.
+        self.rules = RuleClassifier()
+        self.centroids = (
+            CentroidClassifier(embedding_provider) if embedding_provider else None
         )
+        self.tier_counts: Counter = Counter()
 
-        try:
-            intent = QueryType(raw)
-        except ValueError:
-            intent = QueryType.DOCUMENT
+    def route(
+        self,
+        query: str,
+        web_enabled: bool,
+        query_vector: Optional[Sequence[float]] = None,
+    ) -> QueryRoute:
+        intent, tier = self._classify(query, query_vector)
+        self.tier_counts[tier] += 1
 
         if intent == QueryType.GREETING:
-            return QueryRoute(QueryType.GREETING, False)
+            return QueryRoute(QueryType.GREETING, False, tier)
 
         if web_enabled:
-            return QueryRoute(intent, True)
+            return QueryRoute(intent, True, tier)
 
         if intent == QueryType.WEB:
-            return QueryRoute(QueryType.REFUSE, False)
+            return QueryRoute(QueryType.REFUSE, False, tier)
 
         if intent == QueryType.HYBRID:
-            return QueryRoute(QueryType.DOCUMENT, False)
+            return QueryRoute(QueryType.DOCUMENT, False, tier)
+
+        return QueryRoute(intent, False, tier)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.tier_counts)
+
+    def _classify(
+        self, query: str, query_vector: Optional[Sequence[float]] = None
+    ) -> Tuple[QueryType, str]:
+        intent = self.rules.classify(query)
+        if intent is not None:
+            return intent, "rules"
 
-        return QueryRoute(intent, False)
+        if self.centroids is not None:
+            intent, confidence = self.centroids.classify(query, query_vector)
+            if confidence >= settings.ROUTER_CONFIDENCE_THRESHOLD:
+                return intent, "embedding"
+
+        return self._classify_llm(query), "llm"
+
+    def _classify_llm(self, query: str) -> QueryType:
+        # A query that cannot be routed still gets a document answer, so one
+        # failing call never stops a batch
+        try:
+            raw = invoke_with_backoff(
+                self.llm,
+                [
+                    SystemMessage(content=self.system_prompt),
+                    HumanMessage(content=query),
+                ],
+                settings.LLM_MAX_RETRIES,
+                settings.LLM_BACKOFF_BASE,
+            )
+        except Exception as exc:
+            logger.warning("Routing call failed (%s), assuming DOCUMENT", exc)
+            return QueryType.DOCUMENT
+
+        try:
+            return QueryType(raw.strip().upper())
+        except ValueError:
+            return QueryType.DOCUMENT
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from enum import Enum
+
+
+class QueryType(str, Enum):
+    GREETING = "GREETING"
+    DOCUMENT = "DOCUMENT"
+    WEB = "WEB"
+    HYBRID = "HYBRID"
+    REFUSE = "REFUSE"
+
+
+@dataclass(frozen=True)
+class QueryRoute:
+    query_type: QueryType
+    allow_web: bool
+    tier: str = "llm"
@@ -0,0 +1,16 @@
+from .factory import get_trace_sinks, tracer
+from .sinks import JsonlSink, MemorySink, OpenTelemetrySink, SpanSink
+from .tracer import NOOP_SPAN, Span, Trace, Tracer
+
+__all__ = [
+    "get_trace_sinks",
+    "JsonlSink",
+    "MemorySink",
+    "NOOP_SPAN",
+    "OpenTelemetrySink",
+    "Span",
+    "SpanSink",
+    "Trace",
+    "Tracer",
+    "tracer",
+]
@@ -0,0 +1,30 @@
+import logging
+from typing import List
+
+from config import settings
+
+from .sinks import JsonlSink, MemorySink, OpenTelemetrySink, SpanSink
+from .tracer import Tracer
+
+logger = logging.getLogger(__name__)
+
+
+def get_trace_sinks() -> List[SpanSink]:
+    sinks: List[SpanSink] = []
+    for name in filter(None, (s.strip() for s in settings.TRACE_SINKS.split(","))):
+        if name == "memory":
+            sinks.append(MemorySink(settings.TRACE_BUFFER_SIZE))
+        elif name == "jsonl":
+            sinks.append(JsonlSink(settings.TRACE_FILE))
+        elif name == "otel":
+            try:
+                sinks.append(OpenTelemetrySink())
+            except ImportError:
+                logger.warning("opentelemetry is not installed; otel sink skipped")
+        else:
+            raise ValueError(f"Unsupported trace sink: {name}")
+    return sinks
+
+
+# Process-wide, like the shared resources in core.registry
+tracer = Tracer(get_trace_sinks(), settings.TRACING_ENABLED)
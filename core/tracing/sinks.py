@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import List
+
+from .tracer import Trace
+
+
+class SpanSink(ABC):
+    @abstractmethod
+    def emit(self, trace: Trace) -> None:
+        pass
+
+
+class MemorySink(SpanSink):
+    """The most recent traces, for the UI and for inspection in a shell."""
+
+    def __init__(self, max_traces: int = 200):
+        self.traces: deque = deque(maxlen=max_traces)
+
+    def emit(self, trace: Trace) -> None:
+        self.traces.append(trace)
+
+    def recent(self, count: int = 20) -> List[Trace]:
+        return list(self.traces)[-count:]
+
+
+class JsonlSink(SpanSink):
+    """One JSON object per span, appended to `path`."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, trace: Trace) -> None:
+        lines = "".join(
+            json.dumps(span.to_dict(), default=str) + "\n" for span in trace.spans
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class OpenTelemetrySink(SpanSink):
+    """
+    Replays finished traces into OpenTelemetry, so whatever exporter the
+    process configured (OTLP, Jaeger, console) receives them.
+    """
+
+    def __init__(self, service_name: str = "llm-knowledge-system"):
+        from opentelemetry import trace as otel_trace
+
+        self._otel = otel_trace
+        self._tracer = otel_trace.get_tracer(service_name)
+
+    def emit(self, trace: Trace) -> None:
+        contexts = {}
+        for span in sorted(trace.spans, key=lambda s: s.start):
+            parent = contexts.get(span.parent_id)
+            start_ns = int(span.start * 1e9)
+            otel_span = self._tracer.start_span(
+                span.name,
+                context=parent,
+                start_time=start_ns,
+                attributes={
+                    key: (
+                        value
+                        if isinstance(value, (str, bool, int, float))
+                        else str(value)
+                    )
+                    for key, value in span.attributes.items()
+                },
+            )
+            contexts[span.span_id] = self._otel.set_span_in_context(otel_span)
+            duration_ns = int((span.duration_ms or 0) * 1e6)
+            otel_span.end(end_time=start_ns + duration_ns)
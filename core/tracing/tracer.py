@@ -0,0 +1,187 @@
+import contextvars
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "trace",
+        "span_id",
+        "parent_id",
+        "start",
+        "duration_ms",
+        "attributes",
+        "_started",
+        "_token",
+    )
+
+    def __init__(self, name: str, trace: "Trace", parent: Optional["Span"], attributes):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = time.time()
+        self.duration_ms: Optional[float] = None
+        self.attributes: Dict[str, Any] = attributes
+        self._started = time.perf_counter()
+        self._token = None
+        trace.spans.append(self)
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def end(self) -> None:
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        if self.parent_id is None:
+            self.trace.tracer.emit(self.trace)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _current.reset(self._token)
+        self.end()
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    def __init__(self, tracer: "Tracer"):
+        self.tracer = tracer
+        self.trace_id = os.urandom(16).hex()
+        # list.append is atomic, so spans from source threads need no lock
+        self.spans: List[Span] = []
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """Spans depth first, each child under its parent in start order."""
+        children: Dict[Optional[str], List[Span]] = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            children.setdefault(span.parent_id, []).append(span)
+
+        rows: List[Dict[str, Any]] = []
+
+        def visit(span: Span, depth: int) -> None:
+            rows.append(
+                {
+                    "name": span.name,
+                    "depth": depth,
+                    "offset_ms": (span.start - self.root.start) * 1000,
+                    "duration_ms": span.duration_ms,
+                    "attributes": dict(span.attributes),
+                }
+            )
+            for child in children.get(span.span_id, []):
+                visit(child, depth + 1)
+
+        visit(self.root, 0)
+        return rows
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is off or outside any trace."""
+
+    __slots__ = ()
+
+    trace = None
+    elapsed_ms = 0.0
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Records nested, timed spans for one request and hands the finished
+    trace to every sink.
+
+    `trace` opens a root span (or a child, inside an existing trace);
+    `span` only records inside a trace, so library code can be
+    instrumented unconditionally. Both work as context managers, or can
+    be ended by hand with `end()` where a block cannot hold them (across
+    generator yields). While disabled, both return a shared no-op object
+    and cost one attribute check.
+    """
+
+    def __init__(self, sinks: Sequence = (), enabled: bool = True):
+        self.sinks = list(sinks)
+        self.enabled = enabled
+
+    def trace(self, name: str, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current.get()
+        trace = parent.trace if parent is not None else Trace(self)
+        return Span(name, trace, parent, attributes)
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(name, parent.trace, parent, attributes)
+
+    def annotate(self, **attributes) -> None:
+        if not self.enabled:
+            return
+        span = _current.get()
+        if span is not None:
+            span.attributes.update(attributes)
+
+    def propagate(self, fn: Callable) -> Callable:
+        """Run `fn` under the current span when it is called from another thread."""
+        if not self.enabled or _current.get() is None:
+            return fn
+        context = contextvars.copy_context()
+        return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+    def emit(self, trace: Trace) -> None:
+        for sink in self.sinks:
+            try:
+                sink.emit(trace)
+            except Exception:
+                logger.exception("Trace sink %s failed", type(sink).__name__)
@@ -0,0 +1,273 @@
+import json
+import os
+import threading
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Set, Union
+
+import numpy as np
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.documents import Document
+
+from core.cache import LRUCache
+
+DOCSTORE_DATA_FILE = "docstore.jsonl"
+DOCSTORE_TABLE_FILE = "docstore.npy"
+INDEX_IDS_FILE = "index_ids.npy"
+
+
+def _load_array(path: str) -> Optional[np.ndarray]:
+    # Memory-mapped, so opening costs the same whatever the corpus size
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode="r")
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+class PositionIds(MutableMapping):
+    """
+    FAISS position -> chunk id, read from a memory-mapped array written
+    by `save`. Positions added after loading live in a small dict.
+    """
+
+    def __init__(self, base: Optional[np.ndarray] = None):
+        self._base = base if base is not None else np.empty(0, dtype="S1")
+        self._extra: Dict[int, str] = {}
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["PositionIds"]:
+        base = _load_array(os.path.join(directory, INDEX_IDS_FILE))
+        return cls(base) if base is not None else None
+
+    @staticmethod
+    def save(directory: str, mapping: Dict[int, str]) -> None:
+        ids = [mapping[position].encode("utf-8") for position in range(len(mapping))]
+        _save_array(
+            os.path.join(directory, INDEX_IDS_FILE),
+            np.array(ids) if ids else np.empty(0, dtype="S1"),
+        )
+
+    def __getitem__(self, position: int) -> str:
+        if position in self._extra:
+            return self._extra[position]
+        if 0 <= position < len(self._base):
+            return self._base[position].decode("utf-8")
+        raise KeyError(position)
+
+    def __setitem__(self, position: int, chunk_id: str) -> None:
+        self._extra[int(position)] = chunk_id
+
+    def __delitem__(self, position: int) -> None:
+        # FAISS removals renumber every position, so the wrapper replaces
+        # this mapping with a plain dict instead
+        raise TypeError("positions cannot be deleted individually")
+
+    def __iter__(self) -> Iterator[int]:
+        yield from range(len(self._base))
+        yield from (p for p in self._extra if p >= len(self._base))
+
+    def __len__(self) -> int:
+        return len(self._base) + sum(1 for p in self._extra if p >= len(self._base))
+
+    def flush(self) -> None:
+        """Fold positions appended since loading into the id array."""
+        appended = range(len(self._base), len(self))
+        if not appended:
+            return
+        ids = np.array([self._extra.pop(p).encode("utf-8") for p in appended])
+        width = max(self._base.dtype.itemsize, ids.dtype.itemsize)
+        self._base = np.concatenate(
+            [self._base.astype(f"S{width}"), ids.astype(f"S{width}")]
+        )
+
+
+class OffsetDocstore(Docstore, AddableMixin):
+    """
+    Chunk documents in an append-only JSON-lines file, located through a
+    sorted (id, offset, length) table that is memory-mapped on open.
+    Nothing is parsed until a chunk is read, and processes on one host
+    share the file through the page cache.
+
+    Changes stay in memory until `save`; additions are appended to the
+    file, while deletions or replacements rewrite it. `flush` appends new
+    chunks early, leaving only their table rows in memory until `save`.
+    """
+
+    def __init__(self, directory: str, cache_items: int = 4096):
+        self.data_path = os.path.join(directory, DOCSTORE_DATA_FILE)
+        self.table_path = os.path.join(directory, DOCSTORE_TABLE_FILE)
+
+        self._table = _load_array(self.table_path)
+        self._added: Dict[str, Document] = {}
+        self._deleted: Set[str] = set()
+        self._flushed = False
+        self._cache = LRUCache(cache_items)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def search(self, search: str) -> Union[str, Document]:
+        if search in self._deleted:
+            return f"ID {search} not found."
+
+        doc = self._added.get(search) or self._cache.get(search)
+        if doc is not None:
+            return doc
+
+        row = self._find(search)
+        if row is None:
+            return f"ID {search} not found."
+
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.data_path, "rb")
+            self._file.seek(int(row["offset"]))
+            raw = self._file.read(int(row["length"]))
+
+        record = json.loads(raw)
+        doc = Document(
+            id=search, page_content=record["page_content"], metadata=record["metadata"]
+        )
+        self._cache.put(search, doc)
+        return doc
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        for chunk_id, doc in texts.items():
+            self._deleted.discard(chunk_id)
+            self._added[chunk_id] = doc
+
+    def delete(self, ids: List) -> None:
+        for chunk_id in ids:
+            self._added.pop(chunk_id, None)
+            self._cache.pop(chunk_id)
+            if self._find(chunk_id) is not None:
+                self._deleted.add(chunk_id)
+
+    @property
+    def pending(self) -> int:
+        return len(self._added)
+
+    def flush(self) -> None:
+        # Replacements are left for `save`, which rewrites the file anyway
+        new = {k: doc for k, doc in self._added.items() if self._find(k) is None}
+        if not new:
+            return
+
+        with open(self.data_path, "ab") as f:
+            rows = self._write(f, new)
+        for chunk_id in new:
+            del self._added[chunk_id]
+        self._table = _merge(self._existing(), rows)
+        self._flushed = True
+
+    def save(self) -> None:
+        if not self._added and not self._deleted and not self._flushed:
+            return
+
+        replaced = any(self._find(chunk_id) is not None for chunk_id in self._added)
+        if self._deleted or replaced:
+            table = self._rewrite()
+        else:
+            table = self._append()
+
+        _save_array(self.table_path, table[np.argsort(table["id"], kind="stable")])
+        self._table = _load_array(self.table_path)
+        self._added.clear()
+        self._deleted.clear()
+        self._flushed = False
+
+    def _find(self, chunk_id: str) -> Optional[np.void]:
+        if self._table is None or not len(self._table):
+            return None
+        key = chunk_id.encode("utf-8")
+        ids = self._table["id"]
+        position = int(np.searchsorted(ids, key))
+        if position < len(ids) and ids[position] == key:
+            return self._table[position]
+        return None
+
+    def _existing(self) -> np.ndarray:
+        if self._table is None:
+            return _table([], [], [])
+        return np.asarray(self._table)
+
+    def _append(self) -> np.ndarray:
+        with open(self.data_path, "ab") as f:
+            added = self._write(f, self._added)
+        return _concat(self._existing(), added)
+
+    def _rewrite(self) -> np.ndarray:
+        # Copies surviving records byte for byte, then swaps the file in
+        # atomically so readers holding the old one are unaffected
+        existing = self._existing()
+        skip = [k.encode("utf-8") for k in self._deleted | set(self._added)]
+        kept = existing[~np.isin(existing["id"], skip)]
+        kept = kept[np.argsort(kept["offset"])]
+
+        tmp_path = f"{self.data_path}.tmp"
+        offsets = []
+        with open(tmp_path, "wb") as out:
+            if len(kept):
+                with open(self.data_path, "rb") as src:
+                    for offset, length in zip(kept["offset"], kept["length"]):
+                        src.seek(int(offset))
+                        offsets.append(out.tell())
+                        out.write(src.read(int(length)))
+            added = self._write(out, self._added)
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            os.replace(tmp_path, self.data_path)
+
+        return _concat(_table(kept["id"], offsets, kept["length"]), added)
+
+    def _write(self, f, docs: Dict[str, Document]) -> np.ndarray:
+        ids, offsets, lengths = [], [], []
+        for chunk_id, doc in docs.items():
+            line = (
+                json.dumps(
+                    {"page_content": doc.page_content, "metadata": doc.metadata},
+                    ensure_ascii=False,
+                    default=str,
+                ).encode("utf-8")
+                + b"\n"
+            )
+            ids.append(chunk_id.encode("utf-8"))
+            offsets.append(f.tell())
+            lengths.append(len(line))
+            f.write(line)
+            self._cache.put(chunk_id, doc)
+        return _table(ids, offsets, lengths)
+
+
+def _table(ids, offsets, lengths) -> np.ndarray:
+    width = max((len(i) for i in ids), default=1)
+    table = np.empty(
+        len(ids), dtype=[("id", f"S{width}"), ("offset", "<u8"), ("length", "<u4")]
+    )
+    table["id"], table["offset"], table["length"] = ids, offsets, lengths
+    return table
+
+
+def _common_dtype(first: np.ndarray, second: np.ndarray) -> list:
+    # Widen the id column to whichever table has the longer ids
+    width = max(first.dtype["id"].itemsize, second.dtype["id"].itemsize)
+    return [("id", f"S{width}"), ("offset", "<u8"), ("length", "<u4")]
+
+
+def _concat(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    dtype = _common_dtype(first, second)
+    return np.concatenate([first.astype(dtype), second.astype(dtype)])
+
+
+def _merge(table: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    # Insert rows into a table sorted by id, keeping it sorted
+    dtype = _common_dtype(table, rows)
+    table, rows = table.astype(dtype), rows.astype(dtype)
+    rows = rows[np.argsort(rows["id"], kind="stable")]
+    return np.insert(table, np.searchsorted(table["id"], rows["id"]), rows)
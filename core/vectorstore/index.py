@@ -0,0 +1,160 @@
+import json
+import math
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from config import settings
+
+INDEX_PARAMS_FILE = "index_params.json"
+INDEX_TYPES = ("flat", "hnsw", "ivfpq", "sq")
+
+SQ_TYPES = {
+    "8bit": faiss.ScalarQuantizer.QT_8bit,
+    "6bit": faiss.ScalarQuantizer.QT_6bit,
+    "4bit": faiss.ScalarQuantizer.QT_4bit,
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+}
+
+# Zero-copy mapping of the whole index where FAISS supports it (1.11+);
+# older versions only map IVF inverted lists
+MMAP_FLAG = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
+# FAISS wants ~39 training points per centroid; PQ codebooks have
+# 2^nbits centroids, so smaller stores stay flat until they grow
+POINTS_PER_CENTROID = 39
+# Scalar quantizer ranges fitted to fewer vectors clip later ones
+SQ_MIN_TRAINING = 500
+
+
+def min_training_size(index_type: str) -> int:
+    if index_type == "ivfpq":
+        return POINTS_PER_CENTROID * (1 << settings.PQ_NBITS)
+    if index_type == "sq":
+        return SQ_MIN_TRAINING
+    return 1
+
+
+def needs_retraining(params: Dict[str, Any], ntotal: int) -> bool:
+    """Whether a trained index has outgrown the sample it was trained on."""
+    trained_on = params.get("trained_on")
+    if not trained_on or trained_on >= settings.INDEX_TRAIN_SAMPLE:
+        return False
+    return ntotal >= trained_on * settings.INDEX_RETRAIN_GROWTH
+
+
+def _pq_subquantizers(dim: int, wanted: int) -> int:
+    # PQ needs the dimension split evenly
+    for m in range(min(wanted, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def build_index(
+    index_type: str, vectors: np.ndarray
+) -> Tuple[faiss.Index, Dict[str, Any]]:
+    """
+    Create an empty index of `index_type`, trained on a sample of `vectors`
+    when the type needs it. Falls back to flat while there are too few
+    vectors to train on. Returns the index and its parameters.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unsupported index type: {index_type}")
+
+    dim = vectors.shape[1]
+    if index_type == "flat" or len(vectors) < min_training_size(index_type):
+        return faiss.IndexFlatL2(dim), {"index_type": "flat"}
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, settings.HNSW_M)
+        index.hnsw.efConstruction = settings.HNSW_EF_CONSTRUCTION
+        params = {"index_type": "hnsw", "ef_search": settings.HNSW_EF_SEARCH}
+
+    elif index_type == "ivfpq":
+        nlist = settings.IVF_NLIST or int(4 * math.sqrt(len(vectors)))
+        nlist = max(1, min(nlist, len(vectors) // POINTS_PER_CENTROID))
+        pq_m = _pq_subquantizers(dim, settings.PQ_M)
+        index = faiss.IndexIVFPQ(
+            faiss.IndexFlatL2(dim), dim, nlist, pq_m, settings.PQ_NBITS
+        )
+        params = {
+            "index_type": "ivfpq",
+            "nlist": nlist,
+            "pq_m": pq_m,
+            "nprobe": settings.IVF_NPROBE,
+        }
+
+    else:
+        index = faiss.IndexScalarQuantizer(
+            dim, SQ_TYPES[settings.SQ_TYPE], faiss.METRIC_L2
+        )
+        params = {"index_type": "sq", "sq_type": settings.SQ_TYPE}
+
+    if not index.is_trained:
+        sample = vectors
+        if len(vectors) > settings.INDEX_TRAIN_SAMPLE:
+            rng = np.random.default_rng(0)
+            picks = rng.choice(len(vectors), settings.INDEX_TRAIN_SAMPLE, replace=False)
+            sample = vectors[picks]
+        index.train(np.ascontiguousarray(sample, dtype=np.float32))
+        params["trained_on"] = len(sample)
+
+    apply_search_params(index, params)
+    return index, params
+
+
+def apply_search_params(index: faiss.Index, params: Dict[str, Any]) -> None:
+    if "nprobe" in params:
+        faiss.extract_index_ivf(index).nprobe = params["nprobe"]
+    if "ef_search" in params:
+        index.hnsw.efSearch = params["ef_search"]
+
+
+def read_index(path: str, mmap: bool) -> faiss.Index:
+    return faiss.read_index(path, MMAP_FLAG if mmap else 0)
+
+
+def write_index(index: faiss.Index, path: str) -> None:
+    # Renamed into place: processes mapping the old file keep a valid view
+    tmp_path = f"{path}.tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def supports_removal(index: faiss.Index) -> bool:
+    # HNSW graphs cannot drop nodes, and IVF lists drop them without
+    # renumbering the rest, which the position -> chunk id map relies on
+    return not isinstance(index, (faiss.IndexHNSW, faiss.IndexIVF))
+
+
+def reconstruct_all(index: faiss.Index) -> np.ndarray:
+    if isinstance(index, faiss.IndexIVF):
+        # IVF lists are looked up by position through a direct map
+        index.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def empty_copy(index: faiss.Index) -> faiss.Index:
+    """An empty index with the same trained quantizers as `index`."""
+    copy = faiss.clone_index(index)
+    copy.reset()
+    return copy
+
+
+def read_index_params(directory: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(directory, INDEX_PARAMS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_index_params(directory: str, params: Dict[str, Any]) -> None:
+    path = os.path.join(directory, INDEX_PARAMS_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(params, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,118 @@
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_SCHEMA_VERSION = 2
+
+
+class ChunkManifest:
+    """
+    Per-document chunk bookkeeping persisted next to the FAISS index.
+    Read lazily on first access; a missing or outdated file is rebuilt
+    through `fallback` instead of re-embedding anything.
+
+    Chunk ids are content hashes, so one stored chunk can belong to several
+    documents; it is only deleted once its last owner is removed.
+    """
+
+    def __init__(
+        self, directory: str, fallback: Callable[[], Dict[str, Dict[str, Any]]]
+    ):
+        self.path = os.path.join(directory, MANIFEST_FILE)
+        self.fallback = fallback
+        self._documents: Optional[Dict[str, Dict[str, Any]]] = None
+        self._owners: Optional[Dict[str, List[str]]] = None
+
+    @property
+    def documents(self) -> Dict[str, Dict[str, Any]]:
+        if self._documents is None:
+            self._documents = self._read()
+            if self._documents is None:
+                self._documents = self.fallback()
+                if self._documents:
+                    self.save()
+        return self._documents
+
+    @property
+    def owners(self) -> Dict[str, List[str]]:
+        if self._owners is None:
+            owners: Dict[str, List[str]] = {}
+            for doc_id, record in self.documents.items():
+                for chunk_id in record["chunk_ids"]:
+                    owners.setdefault(chunk_id, []).append(doc_id)
+            self._owners = owners
+        return self._owners
+
+    def add(
+        self,
+        doc_id: str,
+        title: Optional[str],
+        content_hash: Optional[str],
+        chunk_ids: List[str],
+    ) -> None:
+        record = self.documents.setdefault(
+            doc_id, {"title": title, "content_hash": content_hash, "chunk_ids": []}
+        )
+        for chunk_id in chunk_ids:
+            owners = self.owners.setdefault(chunk_id, [])
+            if doc_id not in owners:
+                owners.append(doc_id)
+                record["chunk_ids"].append(chunk_id)
+
+    def pop(self, doc_id: str) -> List[str]:
+        """Drop a document and return the chunk ids nobody else owns."""
+        chunk_owners = self.owners
+        record = self.documents.pop(doc_id)
+        orphaned = []
+        for chunk_id in record["chunk_ids"]:
+            owners = chunk_owners[chunk_id]
+            owners.remove(doc_id)
+            if not owners:
+                del chunk_owners[chunk_id]
+                orphaned.append(chunk_id)
+        return orphaned
+
+    def contains_chunk(self, chunk_id: str) -> bool:
+        return chunk_id in self.owners
+
+    def doc_ids_for(self, title: str) -> List[str]:
+        return [
+            doc_id
+            for doc_id, record in self.documents.items()
+            if record["title"] == title
+        ]
+
+    def titles(self) -> List[str]:
+        return list(dict.fromkeys(r["title"] for r in self.documents.values()))
+
+    def save(self) -> None:
+        # Resolved first: a fallback rebuild saves through here as well
+        documents = self.documents
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "schema_version": MANIFEST_SCHEMA_VERSION,
+                    "documents": documents,
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, self.path)
+
+    def reset(self) -> None:
+        self._documents = {}
+        self._owners = {}
+
+    def _read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("schema_version") != MANIFEST_SCHEMA_VERSION:
+            return None
+
+        return data["documents"]
@@ -1,65 +1,514 @@
+import functools
 import os
-from typing import Any, Dict, List
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
 
+import numpy as np
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
 
 from config import settings
-from core.embedding import get_embedding_provider
+from core.document import chunk_content_hash
+from core.embedding import EmbeddingProvider, get_embedding_provider
+from core.retriever.lexical import LexicalIndex
+
+from .docstore import OffsetDocstore, PositionIds
+from .index import (
+    apply_search_params,
+    build_index,
+    empty_copy,
+    min_training_size,
+    needs_retraining,
+    read_index,
+    read_index_params,
+    reconstruct_all,
+    supports_removal,
+    write_index,
+    write_index_params,
+)
+from .lock import ReadWriteLock
+from .manifest import ChunkManifest
 
 FAISS_DIR = settings.FAISS_DIR
+INDEX_PATH = os.path.join(FAISS_DIR, "index.faiss")
+LEGACY_DOCSTORE_PATH = os.path.join(FAISS_DIR, "index.pkl")
+
+
+def _exclusive(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.write():
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class VectorStoreService:
-    def __init__(self):
-        self.embedding_provider = get_embedding_provider()
+    """
+    One instance is shared by every session in the process (see
+    core.registry). Queries run under `reading()`; anything that changes
+    the index, docstore, manifest or lexical index holds the write lock.
+    """
+
+    def __init__(self, embedding_provider: Optional[EmbeddingProvider] = None):
+        self.embedding_provider = embedding_provider or get_embedding_provider()
+        self.lock = ReadWriteLock()
+        self._readers_ready = False
         self.store: FAISS | None = None
-        self._chunks: List[Dict[str, Any]] = []
+        self.index_params: Dict[str, Any] = {"index_type": "flat"}
+        # A memory-mapped index is read-only until `_ensure_writable`
+        self._mapped = False
+
+        self.manifest = ChunkManifest(FAISS_DIR, self._manifest_from_docstore)
+        self.lexical = LexicalIndex(
+            FAISS_DIR,
+            self._texts_from_docstore,
+            compact_ratio=settings.REBUILD_TOMBSTONE_RATIO,
+        )
+
+        # Bumped on every corpus change so answer caches never go stale
+        self.version = 0
 
         os.makedirs(FAISS_DIR, exist_ok=True)
         self._load_index()
 
-    def add_documents(self, chunks: List[Dict[str, Any]]) -> None:
-        self._chunks.extend(chunks)
-        self._rebuild_and_persist()
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        # Lazily loaded state is filled once under the write lock, so
+        # concurrent readers never race to build it
+        if not self._readers_ready:
+            with self.lock.write():
+                self.manifest.documents
+                if settings.RETRIEVAL_MODE == "hybrid":
+                    self.lexical.load()
+                self._readers_ready = True
+
+        with self.lock.read():
+            yield
+
+    def add_documents(self, chunks: List[Dict[str, Any]], persist: bool = True) -> int:
+        """
+        Index chunks, embedding only content not already in the store.
+        Returns the number of newly stored chunks. Embedding runs outside
+        the write lock, so queries are not held up by it.
+        """
+        if not chunks:
+            return 0
+
+        ids = [chunk_content_hash(chunk["content"]) for chunk in chunks]
+        vectors: Dict[str, np.ndarray] = {}
+
+        # Deduplicate under the lock, embed outside it, then store under it.
+        # Another round is only needed if a writer removed a duplicate chunk
+        # in between.
+        while True:
+            with self.lock.write():
+                # Resolve the manifest and lexical index before the new ids
+                # reach the docstore, so a fallback rebuild from the docstore
+                # does not count them twice.
+                self.manifest.documents
+                self.lexical.load()
+
+                fresh = self._unstored(ids)
+                missing = [i for i in fresh if ids[i] not in vectors]
+                if not missing:
+                    stored = self._store(chunks, ids, fresh, vectors, persist)
+                    retrain = self._needs_reembedding()
+                    break
+
+            embedded = self.embedding_provider.embed_documents(
+                [chunks[i]["content"] for i in missing]
+            )
+            vectors.update(
+                (ids[i], np.asarray(vector, dtype=np.float32))
+                for i, vector in zip(missing, embedded)
+            )
+
+        if retrain:
+            self.rebuild()
+        return stored
+
+    def _unstored(self, ids: List[str]) -> List[int]:
+        # Positions of the first occurrence of each id not yet stored
+        seen = set()
+        fresh = []
+        for i, chunk_id in enumerate(ids):
+            if chunk_id in seen or self.manifest.contains_chunk(chunk_id):
+                continue
+            seen.add(chunk_id)
+            fresh.append(i)
+        return fresh
+
+    def _store(
+        self,
+        chunks: List[Dict[str, Any]],
+        ids: List[str],
+        fresh: List[int],
+        vectors: Dict[str, np.ndarray],
+        persist: bool,
+    ) -> int:
+        if fresh:
+            texts = [chunks[i]["content"] for i in fresh]
+            new_ids = [ids[i] for i in fresh]
+            self._append(
+                texts,
+                [chunks[i]["metadata"] for i in fresh],
+                new_ids,
+                np.stack([vectors[chunk_id] for chunk_id in new_ids]),
+            )
+            self.lexical.add(new_ids, texts)
+
+        doc_chunks: Dict[str, List[str]] = {}
+        doc_metadata: Dict[str, Dict[str, Any]] = {}
+        for chunk, chunk_id in zip(chunks, ids):
+            metadata = chunk["metadata"]
+            doc_chunks.setdefault(metadata["doc_id"], []).append(chunk_id)
+            doc_metadata.setdefault(metadata["doc_id"], metadata)
+
+        for doc_id, chunk_ids in doc_chunks.items():
+            metadata = doc_metadata[doc_id]
+            self.manifest.add(
+                doc_id, metadata.get("title"), metadata.get("content_hash"), chunk_ids
+            )
+
+        self.version += 1
+        if persist:
+            self.persist()
+        else:
+            self._flush_records()
+
+        return len(fresh)
 
+    def _flush_records(self) -> None:
+        # Until persist(), new chunk records would otherwise all stay in
+        # memory; write them out once DOCSTORE_FLUSH_ITEMS have accumulated
+        if self.store.docstore.pending < settings.DOCSTORE_FLUSH_ITEMS:
+            return
+        self.store.docstore.flush()
+        if isinstance(self.store.index_to_docstore_id, PositionIds):
+            self.store.index_to_docstore_id.flush()
+
+    @_exclusive
     def remove_document(self, filename: str) -> None:
-        self._chunks = [
-            c for c in self._chunks if c["metadata"].get("title") != filename
-        ]
-        self._rebuild_and_persist()
+        if self.store is None:
+            return
+        self._remove_doc_ids(self.manifest.doc_ids_for(filename))
 
-    def _rebuild_and_persist(self):
-        if not self._chunks:
+    @_exclusive
+    def replace_document(self, title: str, doc_id: str) -> bool:
+        """
+        Make `doc_id`, already stored, the only version of `title`: older
+        versions go in the same step. Returns whether there were any.
+        """
+        if self.store is None:
+            return False
+        previous = [d for d in self.manifest.doc_ids_for(title) if d != doc_id]
+        self._remove_doc_ids(previous)
+        return bool(previous)
+
+    @_exclusive
+    def remove_version(self, doc_id: str) -> None:
+        """Remove one stored version of a document, e.g. a partial one."""
+        if self.store is None or doc_id not in self.manifest.documents:
+            return
+        self._remove_doc_ids([doc_id])
+
+    def _remove_doc_ids(self, doc_ids: List[str]) -> None:
+        for doc_id in doc_ids:
+            chunk_ids = self.manifest.documents[doc_id]["chunk_ids"]
+            orphaned = self.manifest.pop(doc_id)
+            self._reassign_shared_chunks(doc_id, set(chunk_ids) - set(orphaned))
+
+            if orphaned:
+                self._ensure_writable()
+                # Both paths compact the index, so no deleted slots are left
+                # behind to count or rebuild away later
+                if supports_removal(self.store.index):
+                    self.store.delete(orphaned)
+                else:
+                    self._drop_vectors(orphaned)
+                self.lexical.remove(orphaned)
+
+        if not doc_ids:
+            return
+
+        self.version += 1
+
+        if self.store.index.ntotal == 0:
             self.store = None
+            self.manifest.reset()
+            self.lexical.reset()
             self._clear_disk()
             return
 
-        documents = [
-            Document(
-                page_content=c["content"],
-                metadata=c["metadata"],
+        self.persist()
+
+    def is_indexed(self, title: str, content_hash: str) -> bool:
+        with self.reading():
+            return any(
+                self.manifest.documents[doc_id].get("content_hash") == content_hash
+                for doc_id in self.manifest.doc_ids_for(title)
             )
-            for c in self._chunks
-        ]
 
-        self.store = FAISS.from_documents(
-            documents,
-            self.embedding_provider.model,
+    def has_document(self, title: str) -> bool:
+        with self.reading():
+            return bool(self.manifest.doc_ids_for(title))
+
+    @_exclusive
+    def set_search_params(
+        self, nprobe: Optional[int] = None, ef_search: Optional[int] = None
+    ) -> None:
+        """Tune and persist query-time parameters of a trained index."""
+        if nprobe is not None and "nprobe" in self.index_params:
+            self.index_params["nprobe"] = nprobe
+        if ef_search is not None and "ef_search" in self.index_params:
+            self.index_params["ef_search"] = ef_search
+
+        if self.store is not None:
+            apply_search_params(self.store.index, self.index_params)
+            write_index_params(FAISS_DIR, self.index_params)
+
+    def rebuild(self) -> None:
+        """
+        Re-embed every stored chunk into a fresh index of INDEX_TYPE,
+        retraining it; vectors come from the embedding cache when enabled.
+        Chunks are embedded in batches outside the write lock, which is
+        only held to build the new index and swap it in.
+        """
+        vectors: Dict[str, np.ndarray] = {}
+        while True:
+            with self.lock.write():
+                if self.store is None:
+                    return
+                mapping = self.store.index_to_docstore_id
+                ids = [mapping[position] for position in range(len(mapping))]
+                missing = [i for i in ids if i not in vectors]
+
+                if not missing:
+                    matrix = np.stack([vectors[i] for i in ids])
+                    index, self.index_params = build_index(settings.INDEX_TYPE, matrix)
+                    index.add(matrix)
+                    self.store.index = index
+                    self.store.index_to_docstore_id = dict(enumerate(ids))
+                    self._mapped = False
+                    self.persist()
+                    return
+
+            if not self._embed_stored(missing, vectors):
+                raise RuntimeError(f"Chunk {missing[0]} is missing from the docstore")
+
+    def _embed_stored(
+        self, chunk_ids: List[str], vectors: Dict[str, np.ndarray]
+    ) -> int:
+        # Texts are read a batch at a time under the read lock; chunks
+        # removed in the meantime are skipped. Returns how many were embedded.
+        embedded = 0
+        batch_size = settings.INGEST_BATCH_SIZE
+        for start in range(0, len(chunk_ids), batch_size):
+            with self.lock.read():
+                if self.store is None:
+                    return embedded
+                docs = [
+                    (chunk_id, self.store.docstore.search(chunk_id))
+                    for chunk_id in chunk_ids[start : start + batch_size]
+                ]
+            docs = [(i, doc) for i, doc in docs if isinstance(doc, Document)]
+            batch = self.embedding_provider.embed_documents(
+                [doc.page_content for _, doc in docs]
+            )
+            vectors.update(
+                (chunk_id, np.asarray(vector, dtype=np.float32))
+                for (chunk_id, _), vector in zip(docs, batch)
+            )
+            embedded += len(docs)
+        return embedded
+
+    def _append(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str],
+        vectors: np.ndarray,
+    ) -> None:
+        if self.store is None:
+            index, self.index_params = build_index(settings.INDEX_TYPE, vectors)
+            self.store = FAISS(
+                self.embedding_provider,
+                index,
+                OffsetDocstore(FAISS_DIR, settings.DOCSTORE_CACHE_ITEMS),
+                PositionIds(),
+            )
+        else:
+            self._ensure_writable()
+
+        self.store.add_embeddings(
+            list(zip(texts, vectors.tolist())), metadatas=metadatas, ids=ids
+        )
+
+        if self._needs_training() and not self._needs_reembedding():
+            self._train()
+
+    def _needs_training(self) -> bool:
+        # A store that started too small to train switches type once it can,
+        # and a trained one retrains as it grows past its training set
+        configured = settings.INDEX_TYPE
+        ntotal = self.store.index.ntotal
+        if self.index_params["index_type"] != configured:
+            return ntotal >= min_training_size(configured)
+        return needs_retraining(self.index_params, ntotal)
+
+    def _needs_reembedding(self) -> bool:
+        # Quantized codes are lossy, so retraining starts again from the
+        # embeddings; add_documents leaves that to `rebuild`, outside the lock
+        return (
+            self.store is not None
+            and self.index_params["index_type"] not in {"flat", "hnsw"}
+            and self._needs_training()
         )
 
-        self.store.save_local(FAISS_DIR)
+    def _train(self) -> None:
+        vectors = reconstruct_all(self.store.index)
+        index, self.index_params = build_index(settings.INDEX_TYPE, vectors)
+        index.add(vectors)
+        self.store.index = index
+        self._mapped = False
+
+    def _ensure_writable(self) -> None:
+        # Mapped pages cannot grow or shrink; writers take a private copy
+        if self._mapped:
+            self.store.index = read_index(INDEX_PATH, mmap=False)
+            apply_search_params(self.store.index, self.index_params)
+            self._mapped = False
+
+    def _drop_vectors(self, chunk_ids: List[str]) -> None:
+        # For indexes that cannot remove in place: re-add the surviving
+        # vectors to a fresh index of the same kind; no re-embedding needed
+        dropped = set(chunk_ids)
+        kept = [
+            (position, chunk_id)
+            for position, chunk_id in sorted(self.store.index_to_docstore_id.items())
+            if chunk_id not in dropped
+        ]
+
+        vectors = reconstruct_all(self.store.index)
+        vectors = vectors[[position for position, _ in kept]]
+
+        if self.index_params["index_type"] == "ivfpq":
+            # Keep the trained quantizers rather than retrain on lossy codes
+            index = empty_copy(self.store.index)
+            apply_search_params(index, self.index_params)
+        else:
+            index, self.index_params = build_index(
+                self.index_params["index_type"], vectors
+            )
+        index.add(vectors)
+
+        self.store.index = index
+        self.store.docstore.delete(chunk_ids)
+        self.store.index_to_docstore_id = {
+            i: chunk_id for i, (_, chunk_id) in enumerate(kept)
+        }
+
+    def _reassign_shared_chunks(self, doc_id: str, chunk_ids) -> None:
+        # Chunks still owned by another document should cite that document
+        for chunk_id in chunk_ids:
+            doc = self.store.docstore.search(chunk_id)
+            if doc.metadata.get("doc_id") != doc_id:
+                continue
+            owner = self.manifest.owners[chunk_id][0]
+            doc.metadata["doc_id"] = owner
+            doc.metadata["title"] = self.manifest.documents[owner]["title"]
+            # Re-added so the lazily loaded record is written back
+            self.store.docstore.add({chunk_id: doc})
+
+    def list_documents(self) -> List[str]:
+        with self.reading():
+            if self.store is None:
+                return []
+            return self.manifest.titles()
+
+    def _manifest_from_docstore(self) -> Dict[str, Dict[str, Any]]:
+        documents: Dict[str, Dict[str, Any]] = {}
+        if self.store is None:
+            return documents
+
+        for chunk_id in self.store.index_to_docstore_id.values():
+            metadata = self.store.docstore.search(chunk_id).metadata
+            record = documents.setdefault(
+                metadata.get("doc_id"),
+                {
+                    "title": metadata.get("title"),
+                    "content_hash": metadata.get("content_hash"),
+                    "chunk_ids": [],
+                },
+            )
+            record["chunk_ids"].append(chunk_id)
+
+        return documents
+
+    def _texts_from_docstore(self) -> List[tuple]:
+        if self.store is None:
+            return []
+        return [
+            (chunk_id, self.store.docstore.search(chunk_id).page_content)
+            for chunk_id in self.store.index_to_docstore_id.values()
+        ]
+
+    @_exclusive
+    def persist(self):
+        # Chunk records first, so every id the index refers to is readable
+        self.store.docstore.save()
+        PositionIds.save(FAISS_DIR, self.store.index_to_docstore_id)
+        write_index(self.store.index, INDEX_PATH)
+        write_index_params(FAISS_DIR, self.index_params)
+        self.manifest.save()
+        self.lexical.save()
 
     def _load_index(self):
-        index_path = os.path.join(FAISS_DIR, "index.faiss")
-        if not os.path.exists(index_path):
+        if not os.path.exists(INDEX_PATH):
             return
 
-        self.store = FAISS.load_local(
+        self.index_params = read_index_params(FAISS_DIR) or {"index_type": "flat"}
+        mapping = PositionIds.load(FAISS_DIR)
+
+        if mapping is None:
+            self._migrate_legacy_docstore()
+        else:
+            self.store = FAISS(
+                self.embedding_provider,
+                read_index(INDEX_PATH, mmap=settings.INDEX_MMAP),
+                OffsetDocstore(FAISS_DIR, settings.DOCSTORE_CACHE_ITEMS),
+                mapping,
+            )
+            self._mapped = settings.INDEX_MMAP
+
+        apply_search_params(self.store.index, self.index_params)
+
+        # INDEX_TYPE changed since the index was written
+        if self._needs_reembedding():
+            self.rebuild()
+        elif self._needs_training():
+            self._train()
+            self.persist()
+
+    def _migrate_legacy_docstore(self):
+        # Indexes written by FAISS.save_local keep every chunk in one pickle
+        legacy = FAISS.load_local(
             FAISS_DIR,
-            self.embedding_provider.model,
+            self.embedding_provider,
             allow_dangerous_deserialization=True,
         )
+        docstore = OffsetDocstore(FAISS_DIR, settings.DOCSTORE_CACHE_ITEMS)
+        docstore.add(legacy.docstore._dict)
+
+        self.store = FAISS(
+            self.embedding_provider,
+            legacy.index,
+            docstore,
+            legacy.index_to_docstore_id,
+        )
+        self.persist()
+        os.remove(LEGACY_DOCSTORE_PATH)
 
     def _clear_disk(self):
         for f in os.listdir(FAISS_DIR):
@@ -1,5 +1,61 @@
+import argparse
+import json
+import sys
+
+from config import settings
+
+
+def _read_queries(path: str):
+    # Plain text (one question per line) or JSONL with a "query" field
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with stream:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            yield json.loads(line)["query"] if line.startswith("{") else line
+
+
+def run_batch(args):
+    from core.registry import shared_rag_chain
+
+    chain = shared_rag_chain()
+    queries = list(_read_queries(args.input))
+
+    output = (
+        sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    )
+    with output:
+        for result in chain.run_batch(
+            queries,
+            web_enabled=args.web,
+            include_wikipedia=args.wikipedia,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+        ):
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+
+
 def main():
-    print("Hello from llm-knowledge-system!")
+    parser = argparse.ArgumentParser(prog="llm-knowledge-system")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser(
+        "batch", help="answer questions from a file and write JSONL results"
+    )
+    batch.add_argument("input", help="questions, one per line or JSONL; - for stdin")
+    batch.add_argument("-o", "--output", default="-", help="JSONL output path")
+    batch.add_argument("--web", action="store_true", help="include web search")
+    batch.add_argument("--wikipedia", action="store_true", help="include Wikipedia")
+    batch.add_argument("--batch-size", type=int, default=settings.BATCH_SIZE)
+    batch.add_argument(
+        "--concurrency", type=int, default=settings.BATCH_LLM_CONCURRENCY
+    )
+    batch.set_defaults(handler=run_batch)
+
+    args = parser.parse_args()
+    args.handler(args)
 
 
 if __name__ == "__main__":
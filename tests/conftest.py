@@ -0,0 +1,56 @@
+import dataclasses
+import hashlib
+from typing import List
+
+import numpy as np
+import pytest
+
+import core.vectorstore.index as index_module
+import core.vectorstore.store as store_module
+from config import settings
+from core.embedding import EmbeddingProvider
+from core.vectorstore import VectorStoreService
+
+DIM = 32
+
+
+class SeededEmbeddingProvider(EmbeddingProvider):
+    """A fixed random vector per text: distinct texts stay far apart."""
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8])
+        return np.random.default_rng(seed).standard_normal(DIM).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text)
+
+
+@pytest.fixture
+def embedding_provider() -> SeededEmbeddingProvider:
+    return SeededEmbeddingProvider()
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    """A store under tmp_path with seeded embeddings and small PQ settings."""
+    monkeypatch.chdir(tmp_path)
+
+    def make(index_type: str = "flat", **overrides) -> VectorStoreService:
+        patched = dataclasses.replace(
+            settings,
+            INDEX_TYPE=index_type,
+            INDEX_MMAP=False,
+            PQ_M=8,
+            PQ_NBITS=4,
+            IVF_NLIST=8,
+            IVF_NPROBE=8,
+            **overrides,
+        )
+        monkeypatch.setattr(store_module, "settings", patched)
+        monkeypatch.setattr(index_module, "settings", patched)
+        return VectorStoreService(SeededEmbeddingProvider())
+
+    return make
@@ -0,0 +1,17 @@
+import numpy as np
+
+import core.embedding.cache as cache_module
+from core.embedding.cache import EmbeddingCache
+
+
+def test_get_many_looks_keys_up_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "SQL_BATCH_SIZE", 3)
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_memory_items=1)
+    vectors = {f"k{i}": np.full(4, i, dtype=np.float32) for i in range(10)}
+    cache.put_many(vectors)
+
+    found = cache.get_many([*vectors, "absent"])
+
+    assert set(found) == set(vectors)
+    assert all(np.array_equal(found[key], vectors[key]) for key in vectors)
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,87 @@
+from core.ingest import IngestionPipeline
+from core.vectorstore import VectorStoreService
+
+
+def _write(path, word: str, paragraphs: int = 12) -> None:
+    path.write_text(
+        "\n\n".join(
+            f"{word} paragraph {i} " + "filler text " * 60 for i in range(paragraphs)
+        ),
+        encoding="utf-8",
+    )
+
+
+def _contents(store):
+    faiss_store = store.get_store()
+    return sorted(
+        faiss_store.docstore.search(chunk_id).page_content
+        for chunk_id in faiss_store.index_to_docstore_id.values()
+    )
+
+
+def _ingest(store, path):
+    pipeline = IngestionPipeline(store, workers=1, batch_size=4)
+    return pipeline.ingest([(str(path), "notes.txt")])
+
+
+def test_changed_file_replaces_previous_version(make_store, tmp_path):
+    store = make_store()
+    path = tmp_path / "notes.txt"
+    _write(path, "alpha")
+    _ingest(store, path)
+
+    _write(path, "beta")
+    report = _ingest(store, path)
+
+    assert report.replaced == ["notes.txt"]
+    assert len(store.manifest.doc_ids_for("notes.txt")) == 1
+    assert all(text.startswith("beta") for text in _contents(store))
+
+
+def test_failed_replacement_keeps_previous_version(make_store, tmp_path, monkeypatch):
+    store = make_store()
+    path = tmp_path / "notes.txt"
+    _write(path, "alpha")
+    _ingest(store, path)
+    before = _contents(store)
+
+    embed = store.embedding_provider.embed_documents
+    calls = []
+
+    def flaky(texts):
+        calls.append(texts)
+        if len(calls) == 2:
+            raise RuntimeError("embedding backend down")
+        return embed(texts)
+
+    monkeypatch.setattr(store.embedding_provider, "embed_documents", flaky)
+    _write(path, "beta")
+    report = _ingest(store, path)
+
+    assert report.failures == {"notes.txt": "embedding backend down"}
+    assert report.ingested == [] and report.replaced == []
+    assert len(store.manifest.doc_ids_for("notes.txt")) == 1
+    assert _contents(store) == before
+
+
+def test_ingest_flushes_chunk_records_as_it_goes(make_store, tmp_path, monkeypatch):
+    store = make_store(DOCSTORE_FLUSH_ITEMS=8)
+    path = tmp_path / "notes.txt"
+    _write(path, "alpha", paragraphs=40)
+
+    add = store.add_documents
+    pending = []
+
+    def add_documents(chunks, persist=True):
+        stored = add(chunks, persist=persist)
+        pending.append(store.get_store().docstore.pending)
+        return stored
+
+    monkeypatch.setattr(store, "add_documents", add_documents)
+    report = _ingest(store, path)
+
+    assert report.chunks > 8 * 4
+    assert max(pending) < 8
+    reloaded = VectorStoreService(store.embedding_provider)
+    assert _contents(reloaded) == _contents(store)
+    assert len(_contents(reloaded)) == report.embedded
@@ -0,0 +1,17 @@
+from langchain_core.documents import Document
+
+from core.retriever import PassageReranker
+
+
+def test_rerank_leaves_the_passed_documents_unchanged(embedding_provider):
+    documents = [
+        Document(page_content=f"passage {i}", metadata={"source": "web"})
+        for i in range(3)
+    ]
+    reranker = PassageReranker(embedding_provider, 1000, 2)
+
+    selected = reranker.rerank("passage 1", documents)
+
+    assert selected[0].page_content == "passage 1"
+    assert all("score" in doc.metadata for doc in selected)
+    assert [doc.metadata for doc in documents] == [{"source": "web"}] * 3
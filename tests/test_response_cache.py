@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+
+import core.cache.response as response_module
+from core.cache import ResponseCache, web_response_cache
+
+
+def test_expired_rows_are_deleted_on_write(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_module, "time", SimpleNamespace(time=lambda: now[0]))
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), 10, 5, 4)
+
+    cache.get_or_fetch("web", ("old",), lambda: 1)
+    now[0] += 12
+    cache.get_or_fetch("web", ("stale",), lambda: 2)
+    now[0] += 5
+    cache.get_or_fetch("wikipedia", ("new",), lambda: 3)
+
+    rows = cache._conn.execute("SELECT key FROM responses ORDER BY key").fetchall()
+    assert rows == [('web:["stale"]',), ('wikipedia:["new"]',)]
+
+
+def test_web_sources_share_one_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert web_response_cache() is web_response_cache()
@@ -0,0 +1,50 @@
+import dataclasses
+
+import pytest
+
+import core.router.query_router as router_module
+from config import settings
+from core.llm import LLMProvider
+from core.router import QueryRouter, QueryType
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class FlakyLLM(LLMProvider):
+    """Rate-limited for the first `failures` calls, then answers `label`."""
+
+    def __init__(self, failures: int, label: str = "WEB"):
+        self.failures = failures
+        self.label = label
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RateLimited("429 Too Many Requests")
+        return self.label
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    patched = dataclasses.replace(settings, LLM_MAX_RETRIES=2, LLM_BACKOFF_BASE=0.0)
+    monkeypatch.setattr(router_module, "settings", patched)
+
+
+QUERY = "quarterly figures for the widget division"
+
+
+def test_routing_call_is_retried_after_a_rate_limit():
+    llm = FlakyLLM(failures=2)
+    route = QueryRouter(llm=llm).route(QUERY, web_enabled=True)
+    assert route.query_type == QueryType.WEB
+    assert llm.calls == 3
+
+
+def test_failed_routing_call_falls_back_to_documents():
+    llm = FlakyLLM(failures=10)
+    route = QueryRouter(llm=llm).route(QUERY, web_enabled=True)
+    assert route.query_type == QueryType.DOCUMENT
+    assert llm.calls == 3
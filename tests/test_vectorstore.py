@@ -0,0 +1,120 @@
+import pytest
+
+from core.vectorstore import VectorStoreService
+
+
+def _chunks(doc: str, count: int):
+    return [
+        {
+            "content": f"{doc} chunk {i}",
+            "metadata": {"doc_id": doc, "title": doc, "content_hash": doc},
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivfpq", "sq"])
+def test_remove_document_keeps_positions_mapped(make_store, index_type):
+    store = make_store(index_type)
+    store.add_documents(_chunks("a", 400) + _chunks("b", 50) + _chunks("c", 400))
+    assert store.index_params["index_type"] == index_type
+
+    store.remove_document("b")
+
+    faiss_store = store.get_store()
+    assert store.index_params["index_type"] == index_type
+    assert faiss_store.index.ntotal == 800
+    assert len(faiss_store.index_to_docstore_id) == 800
+
+    provider = store.embedding_provider
+    expected = [chunk["content"] for chunk in _chunks("a", 50) + _chunks("c", 50)]
+    found = [
+        faiss_store.similarity_search_by_vector(provider.embed_query(text), k=1)[0]
+        for text in expected
+    ]
+
+    assert all(doc.metadata["title"] != "b" for doc in found)
+    matches = sum(doc.page_content == text for doc, text in zip(found, expected))
+    # Product quantization is lossy; the other types are exact here
+    assert matches >= (0.9 if index_type == "ivfpq" else 1.0) * len(expected)
+
+
+def test_removed_ivf_document_survives_reload(make_store):
+    store = make_store("ivfpq")
+    store.add_documents(_chunks("a", 50) + _chunks("b", 800))
+    store.remove_document("a")
+
+    reloaded = VectorStoreService(store.embedding_provider)
+    assert reloaded.manifest.titles() == ["b"]
+    hits = reloaded.get_store().similarity_search_by_vector(
+        store.embedding_provider.embed_query("b chunk 7"), k=5
+    )
+    assert [doc.metadata["title"] for doc in hits] == ["b"] * 5
+
+
+def test_quantized_index_waits_for_a_training_sample(make_store):
+    store = make_store("sq")
+    store.add_documents(_chunks("a", 100))
+    assert store.index_params["index_type"] == "flat"
+
+    store.add_documents(_chunks("b", 500))
+    assert store.index_params["index_type"] == "sq"
+    assert store.index_params["trained_on"] == 600
+
+    # Retrained once the store is INDEX_RETRAIN_GROWTH times its sample
+    store.add_documents(_chunks("c", 1000))
+    assert store.index_params["trained_on"] == 600
+    store.add_documents(_chunks("d", 1000))
+    assert store.index_params["trained_on"] == 2600
+    assert store.get_store().index.ntotal == 2600
+
+
+def test_embedding_runs_outside_the_write_lock(make_store, monkeypatch):
+    store = make_store("flat")
+    embed = store.embedding_provider.embed_documents
+    locked = []
+
+    def probe(texts):
+        locked.append(store.lock._writer is not None)
+        return embed(texts)
+
+    monkeypatch.setattr(store.embedding_provider, "embed_documents", probe)
+    assert store.add_documents(_chunks("a", 10)) == 10
+    assert store.add_documents(_chunks("a", 10) + _chunks("b", 5)) == 5
+    assert locked == [False, False]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_removal_compacts_without_reembedding(make_store, monkeypatch, index_type):
+    store = make_store(index_type)
+    store.add_documents(_chunks("a", 100) + _chunks("b", 300))
+
+    def embed(texts):
+        raise AssertionError("removal re-embedded the store")
+
+    monkeypatch.setattr(store.embedding_provider, "embed_documents", embed)
+    store.remove_document("b")
+
+    assert store.index_params["index_type"] == index_type
+    assert store.get_store().index.ntotal == 100
+
+
+def test_retraining_embeds_in_batches_outside_the_write_lock(make_store, monkeypatch):
+    store = make_store("sq", INGEST_BATCH_SIZE=100)
+    store.add_documents(_chunks("a", 600))
+    assert store.index_params["trained_on"] == 600
+
+    embed = store.embedding_provider.embed_documents
+    calls = []
+
+    def probe(texts):
+        calls.append((store.lock._writer is not None, len(texts)))
+        return embed(texts)
+
+    monkeypatch.setattr(store.embedding_provider, "embed_documents", probe)
+    store.add_documents(_chunks("b", 1800))
+
+    assert store.index_params["trained_on"] == 2400
+    assert not any(locked for locked, _ in calls)
+    # The new chunks in one call, then the corpus re-embedded in batches
+    assert [size for _, size in calls] == [1800] + [100] * 24
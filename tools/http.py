@@ -0,0 +1,51 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import settings
+
+# Only failures that are safe and quick to repeat: connection errors (the
+# request never went out, so POST too) and throttling or server errors on
+# idempotent methods. Read timeouts are not retried.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BACKOFF = 0.2
+
+_session: requests.Session | None = None
+_lock = threading.Lock()
+
+
+def request_timeout(deadline: float) -> float:
+    """Per-attempt timeout so that all retries fit within `deadline` seconds."""
+    attempts = settings.HTTP_RETRIES + 1
+    backoff = sum(RETRY_BACKOFF * 2**i for i in range(settings.HTTP_RETRIES))
+    return max(0.1, min(settings.HTTP_TIMEOUT, (deadline - backoff) / attempts))
+
+
+def get_http_session() -> requests.Session:
+    """Process-wide session so web tools reuse keep-alive connections."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=settings.HTTP_POOL_SIZE,
+                    pool_maxsize=settings.HTTP_POOL_SIZE,
+                    max_retries=Retry(
+                        total=settings.HTTP_RETRIES,
+                        connect=settings.HTTP_RETRIES,
+                        read=0,
+                        status=settings.HTTP_RETRIES,
+                        status_forcelist=RETRY_STATUSES,
+                        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                        backoff_factor=RETRY_BACKOFF,
+                        respect_retry_after_header=False,
+                        raise_on_status=False,
+                    ),
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
@@ -1,40 +1,73 @@
-import os
-from typing import List
+from typing import Any, Dict, List
 
 from langchain_core.documents import Document
-from langchain_tavily import TavilySearch
 
 from config.settings import settings
+from core.cache import normalize_query, web_response_cache
+from core.document.chunker import DocumentChunker
+from core.tracing import tracer
+
+from .http import get_http_session, request_timeout
+
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
 
 
 class TavilySearchService:
     def __init__(self, max_results: int = 5, topic: str = "general"):
-        os.environ["TAVILY_API_KEY"] = settings.TAVILY_API_KEY
-
-        self.search_tool = TavilySearch(
-            max_results=max_results,
-            topic=topic,
-        )
+        self.max_results = max_results
+        self.topic = topic
+        self.session = get_http_session()
+        self.chunker = DocumentChunker()
+        self.cache = web_response_cache()
 
     def search(self, query: str) -> List[Document]:
-        results = self.search_tool.invoke(query)
-
-        documents: List[Document] = []
+        with tracer.span("web", provider="tavily") as span:
+            results = self.cache.get_or_fetch(
+                "tavily",
+                (normalize_query(query), self.max_results, self.topic),
+                lambda: self._fetch(query),
+            )
+            span.set(results=len((results or {}).get("results") or []))
 
         if not results or not results.get("results"):
-            return documents
+            return []
 
-        for item in results["results"]:
-            documents.append(
-                Document(
-                    page_content=item.get("content", ""),
-                    metadata={
+        # Long page extracts are split like any other source so only the
+        # relevant passages compete for the prompt
+        chunks = self.chunker.chunk(
+            [
+                {
+                    "content": item.get("content", ""),
+                    "metadata": {
                         "source_type": "web",
                         "title": item.get("title", "Web Result"),
                         "url": item.get("url"),
                         "source_id": "tavily",
                     },
-                )
-            )
+                }
+                for item in results["results"]
+            ]
+        )
 
-        return documents
+        return [
+            Document(page_content=chunk["content"], metadata=chunk["metadata"])
+            for chunk in chunks
+        ]
+
+    def _fetch(self, query: str) -> Dict[str, Any]:
+        api_key = settings.require("TAVILY_API_KEY")
+        response = self.session.post(
+            TAVILY_SEARCH_URL,
+            json={
+                "query": query,
+                "max_results": self.max_results,
+                "topic": self.topic,
+            },
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=request_timeout(settings.WEB_TIMEOUT),
+        )
+        response.raise_for_status()
+        return response.json()
@@ -1,49 +1,46 @@
 import streamlit as st
 
-from core.chain import RAGChain
-from core.document import DocumentProcessor, WikipediaDocumentLoader
-from core.retriever import RetrieverService
-from core.vectorstore import VectorStoreService
+from core.ingest import IngestionPipeline, IngestReport
+from core.registry import shared_rag_chain, shared_vector_store
 from ui.components import delete_uploaded_file, save_uploaded_file
 
 
 class ChatInterface:
     def __init__(self):
-        self.doc_processor = DocumentProcessor()
-        self.vector_store = VectorStoreService()
-        self.retriever_service = RetrieverService(self.vector_store)
-        self.rag_chain = RAGChain(self.retriever_service)
-        self.wiki_loader = WikipediaDocumentLoader()
-
-    def process_documents(self, uploaded_files) -> int:
-        all_chunks = []
-
-        for uploaded_file in uploaded_files:
-            path = save_uploaded_file(uploaded_file)
-            chunks = self.doc_processor.process(path)
-
-            for chunk in chunks:
-                chunk["metadata"]["title"] = uploaded_file.name
-
-            all_chunks.extend(chunks)
-
-            if uploaded_file.name not in st.session_state.uploaded_files:
-                st.session_state.uploaded_files.append(uploaded_file.name)
-
-        if all_chunks:
-            self.vector_store.add_documents(all_chunks)
+        # Per session only this wrapper exists; the model, index and LLM
+        # clients behind it are shared by the whole process
+        self.vector_store = shared_vector_store()
+        self.rag_chain = shared_rag_chain()
+        self.retriever_service = self.rag_chain.retriever_service
+        self.ingestion = IngestionPipeline(self.vector_store)
+
+        for title in self.vector_store.list_documents():
+            if title not in st.session_state.uploaded_files:
+                st.session_state.uploaded_files.append(title)
+                st.session_state.vector_store_initialized = True
+
+    def process_documents(self, uploaded_files, on_progress=None) -> IngestReport:
+        files = [(save_uploaded_file(f), f.name) for f in uploaded_files]
+        report = self.ingestion.ingest(files, on_progress)
+
+        for name in report.ingested + report.skipped:
+            if name not in st.session_state.uploaded_files:
+                st.session_state.uploaded_files.append(name)
+
+        if report.ingested or report.skipped:
             st.session_state.vector_store_initialized = True
 
-        return len(all_chunks)
+        return report
 
     def answer(self, query: str, web_enabled: bool, include_wikipedia: bool = False):
-        wiki_docs = []
-        if include_wikipedia:
-            wiki_docs = self.wiki_loader.load(query)
-
-        result = self.rag_chain.run(query, web_enabled, wiki_docs)
+        result = self.rag_chain.run(query, web_enabled, include_wikipedia)
         return result["answer"], result["sources"]
 
+    def answer_stream(
+        self, query: str, web_enabled: bool, include_wikipedia: bool = False
+    ):
+        return self.rag_chain.run_stream(query, web_enabled, include_wikipedia)
+
     def delete_document(self, filename: str):
         self.vector_store.remove_document(filename)
         delete_uploaded_file(filename)
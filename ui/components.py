@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 import streamlit as st
 
@@ -20,9 +20,14 @@ def init_session_state():
         st.session_state.vector_store_initialized = False
 
 
-def add_message(role: str, content: str, sources: Optional[str] = None):
+def add_message(
+    role: str,
+    content: str,
+    sources: Optional[str] = None,
+    timing: Optional[List[Dict[str, Any]]] = None,
+):
     st.session_state.messages.append(
-        {"role": role, "content": content, "sources": sources}
+        {"role": role, "content": content, "sources": sources, "timing": timing}
     )
 
 
@@ -34,6 +39,26 @@ def display_chat_history():
                 with st.expander("📚 sources"):
                     for src in message["sources"]:
                         st.markdown(f"- {src}")
+            display_timing(message.get("timing"))
+
+
+def display_timing(timing: Optional[List[Dict[str, Any]]]):
+    """Per-stage breakdown of one answer, from `Trace.breakdown()`."""
+    if not timing:
+        return
+
+    lines = []
+    for row in timing:
+        duration = row["duration_ms"]
+        took = "unfinished" if duration is None else f"{duration:.0f} ms"
+        details = " · ".join(f"{k}={v}" for k, v in row["attributes"].items())
+        lines.append(
+            f"{'    ' * row['depth']}- **{row['name']}** {took}"
+            + (f" · {details}" if details else "")
+        )
+
+    with st.expander(f"⏱️ {timing[0]['duration_ms'] or 0:.0f} ms"):
+        st.markdown("\n".join(lines))
 
 
 def clear_chat():
@@ -41,7 +66,6 @@ def clear_chat():
 
 
 def save_uploaded_file(uploaded_file) -> str:
-    print("uploaded file:", uploaded_file)
     file_path = os.path.join(UPLOAD_DIR, uploaded_file.name)
 
     with open(file_path, "wb") as f: